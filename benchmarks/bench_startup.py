@@ -0,0 +1,205 @@
+# Measures what the plugin adds to Plover's startup, and how long the tool
+# window takes to open:
+#
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --window --entries 200000
+#
+# Plover imports every plugin's entry points when it starts, whether or not
+# the tool is ever opened, so the import time of those modules is paid on
+# every launch. Each import is timed in a fresh interpreter.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import Dict, List, Optional, Tuple
+
+
+# What Plover imports at startup, from setup.cfg
+ENTRY_MODULES = (
+    "plover_autobrief.autobrief_suggestions",
+    "plover_autobrief.autobrief_macros"
+)
+
+# Only needed once the tool is used, so they shouldn't show up at startup
+DEFERRED_MODULES = (
+    "multiprocessing",
+    "sqlite3",
+    "plover.gui_qt.add_translation_dialog",
+    "plover_autobrief.autobrief_batch",
+    "plover_autobrief.autobrief_briefer",
+    "plover_autobrief.autobrief_brief_cache",
+    "plover_autobrief.autobrief_pool",
+    "plover_autobrief.config_ui",
+    "plover_autobrief.stats_ui"
+)
+
+# Imported by Plover itself before any plugin, so not counted against it
+PRELOADED_MODULES = (
+    "PyQt5.QtCore",
+    "PyQt5.QtGui",
+    "PyQt5.QtWidgets",
+    "plover.engine",
+    "plover.gui_qt.tool",
+    "plover.gui_qt.utils",
+    "plover.translation"
+)
+
+
+def import_times(module: str) -> Tuple[float, Dict[str, float], List[str]]:
+    # Returns the total import time in seconds, the cumulative time of each
+    # module imported along the way, and which deferred modules got loaded
+    script = (
+        "import importlib, json, sys\n"
+        f"for name in {PRELOADED_MODULES!r}:\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "    except ImportError:\n"
+        "        pass\n"
+        "sys.stderr.write('--- start\\n')\n"
+        f"import {module}\n"
+        f"print(json.dumps([name for name in {DEFERRED_MODULES!r} if name in sys.modules]))\n"
+    )
+    env = dict(os.environ)
+    env["QT_QPA_PLATFORM"] = env.get("QT_QPA_PLATFORM", "offscreen")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        env=env
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        raise SystemExit(f"Couldn't import {module}: {error[-1] if error else result.returncode}")
+
+    cumulative: Dict[str, float] = {}
+    log = result.stderr.split("--- start\n", 1)[-1]
+    for line in log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, total, name = line[len("import time:"):].split("|")
+        if total.strip().isdigit():
+            cumulative[name.strip()] = int(total) / 1e6
+
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return cumulative.get(module, 0.0), cumulative, loaded
+
+
+def time_window(entries: int) -> Dict[str, float]:
+    # Opens the tool against the stand-in engine from bench_strokes
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import bench_strokes
+
+    import random
+    import tempfile
+
+    from PyQt5.QtCore import QCoreApplication, QSettings
+    from PyQt5.QtWidgets import QApplication
+
+    import plover.oslayer.config as plover_config
+    from plover import system
+    from plover.registry import registry
+
+    temp_dir = tempfile.TemporaryDirectory(prefix="autobrief-bench-")
+    plover_config.CONFIG_DIR = temp_dir.name
+    QSettings.setDefaultFormat(QSettings.IniFormat)
+    QSettings.setPath(QSettings.IniFormat, QSettings.UserScope, temp_dir.name)
+    QCoreApplication.setOrganizationName("autobrief-benchmark")
+    QCoreApplication.setApplicationName("autobrief-benchmark")
+    app = QApplication([])
+    registry.update()
+    system.setup("English Stenotype")
+
+    engine = bench_strokes.FakeEngine(bench_strokes.build_dictionary(random.Random(0), entries))
+
+    clock = time.perf_counter
+    start = clock()
+    from plover_autobrief.autobrief_suggestions import AutobriefSuggestions
+    imported = clock()
+    tool = AutobriefSuggestions(engine)
+    constructed = clock()
+    app.processEvents()
+    painted = clock()
+
+    # The briefing script is loaded the first time a word needs a brief
+    tool.config.brief_gen_builtin = True
+    tool.config.load_brief_gen()
+    start_brief = clock()
+    tool.brief_text("example")
+    first_brief = clock()
+
+    # The index build is started from a timer, after the first paint
+    while not tool._outline_index.ready:
+        app.processEvents()
+        time.sleep(0.005)
+    indexed = clock()
+
+    tool._worker.stop()
+    tool.config.close()
+    return {
+        "import_s": imported - start,
+        "construct_s": constructed - imported,
+        "first_paint_s": painted - start,
+        "first_brief_s": first_brief - start_brief,
+        "index_ready_s": indexed - start
+    }
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark autobrief's startup cost.")
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    parser.add_argument("--window", action="store_true", help="also time opening the tool window")
+    parser.add_argument("--entries", type=int, default=100000, help="synthetic dictionary size for --window")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    options = parser.parse_args(args)
+
+    results = {"imports": {}}
+    for module in ENTRY_MODULES:
+        runs = [import_times(module) for _ in range(options.runs)]
+        totals = [total for total, _, _ in runs]
+        _, cumulative, loaded = runs[-1]
+        slowest = sorted(
+            (item for item in cumulative.items() if item[0] != module),
+            key=lambda item: item[1],
+            reverse=True
+        )[:options.top]
+        results["imports"][module] = {
+            "median_ms": statistics.median(totals) * 1000,
+            "min_ms": min(totals) * 1000,
+            "slowest": {name: seconds * 1000 for name, seconds in slowest},
+            "deferred_loaded": loaded
+        }
+
+    if options.window:
+        results["window"] = {
+            name: seconds * 1000 for name, seconds in time_window(options.entries).items()
+        }
+
+    if options.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    for module, stats in results["imports"].items():
+        print(f"{module}: {stats['median_ms']:.1f} ms median, {stats['min_ms']:.1f} ms best of {options.runs}")
+        for name, ms in stats["slowest"].items():
+            print(f"  {ms:>8.1f} ms  {name}")
+        if stats["deferred_loaded"]:
+            print(f"  loaded at startup but only needed later: {', '.join(stats['deferred_loaded'])}")
+        print()
+
+    if "window" in results:
+        print(f"Opening the tool ({options.entries} entries):")
+        for name, ms in results["window"].items():
+            print(f"  {name:<16}{ms:>9.1f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+# Replays a stroke stream through the autobrief tool against a stand-in
+# engine and a synthetic dictionary, and reports what each stroke costs:
+#
+#   python benchmarks/bench_strokes.py --entries 100000 --words 5000
+#   python benchmarks/bench_strokes.py --entries 1000000 --text transcript.txt
+#
+# Runs headless on Qt's offscreen platform. Settings, caches and history go
+# to a temporary directory, so nothing in the Plover config is touched.
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from collections import defaultdict, deque
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Set, Tuple
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QCoreApplication, QSettings
+from PyQt5.QtWidgets import QApplication
+
+import plover.oslayer.config as plover_config
+from plover import system
+from plover.registry import registry
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+StenoOutline = Tuple[str, ...]
+
+LEFT_KEYS = "STKPWHR"
+VOWEL_KEYS = "AO*EU"
+RIGHT_KEYS = "FRPBLGTSDZ"
+SYLLABLES = (
+    "ka", "to", "mi", "ren", "sul", "ba", "de", "for", "gan", "lio",
+    "pre", "ter", "ush", "vo", "wen", "xi", "zor", "ath", "im", "quo"
+)
+
+
+def random_stroke(rng: random.Random) -> str:
+    left = "".join(key for key in LEFT_KEYS if rng.random() < 0.3)
+    vowels = "".join(key for key in VOWEL_KEYS if rng.random() < 0.25)
+    right = "".join(key for key in RIGHT_KEYS if rng.random() < 0.25)
+    if right and not vowels:
+        vowels = "-"
+
+    return (left + vowels + right) or "S"
+
+
+_stroke_pool: List[str] = []
+
+
+def random_outline(rng: random.Random, length: int) -> StenoOutline:
+    # Drawn from a fixed pool, as building strokes key by key is too slow
+    # for a million entries
+    if not _stroke_pool:
+        _stroke_pool.extend(sorted({random_stroke(rng) for _ in range(20000)}))
+
+    return tuple(rng.choice(_stroke_pool) for _ in range(length))
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4)))
+
+
+class FakeTranslation:
+    __slots__ = ("rtfcre", "english")
+
+    def __init__(self, rtfcre: StenoOutline, english: str) -> None:
+        self.rtfcre = rtfcre
+        self.english = english
+
+
+class FakeDictionary(dict):
+    enabled = True
+    readonly = False
+    path = "benchmark.json"
+
+    def __init__(self, entries: Dict[StenoOutline, str]) -> None:
+        super().__init__()
+        self.reverse: Dict[str, List[StenoOutline]] = defaultdict(list)
+        for outline, translation in entries.items():
+            self[outline] = translation
+
+    def __setitem__(self, outline: StenoOutline, translation: str) -> None:
+        super().__setitem__(outline, translation)
+        self.reverse[translation].append(outline)
+
+    def reverse_lookup(self, translation: str) -> Set[StenoOutline]:
+        return set(self.reverse.get(translation, ()))
+
+
+class FakeDictionaries:
+    def __init__(self, dictionary: FakeDictionary) -> None:
+        self.dicts = [dictionary]
+
+    def lookup(self, outline: StenoOutline) -> Optional[str]:
+        return self.dicts[0].get(outline)
+
+    def reverse_lookup(self, translation: str) -> Set[StenoOutline]:
+        return self.dicts[0].reverse_lookup(translation)
+
+    def get(self, path: str) -> FakeDictionary:
+        return self.dicts[0]
+
+    def first_writable(self) -> FakeDictionary:
+        return self.dicts[0]
+
+    def set(self, outline: StenoOutline, translation: str, path: str = None) -> None:
+        self.dicts[0][outline] = translation
+
+    def save(self, path_list=None) -> None:
+        pass
+
+
+class FakeTranslatorState:
+    def __init__(self) -> None:
+        self.translations: deque = deque(maxlen=8)
+
+    def prev(self, count: int = 1) -> List[FakeTranslation]:
+        return list(self.translations)[-count:]
+
+
+class FakeEngine:
+    # Stands in for StenoEngine: the hooks are called directly, in the same
+    # order Plover calls them for a stroke.
+    def __init__(self, dictionary: FakeDictionary) -> None:
+        self.dictionaries = FakeDictionaries(dictionary)
+        self.translator_state = FakeTranslatorState()
+        self._translator = SimpleNamespace()
+        self._hooks = defaultdict(list)
+
+    def __enter__(self) -> "FakeEngine":
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def signal_connect(self, name: str, callback) -> None:
+        self._hooks[name].append(callback)
+
+    def emit(self, name: str, *args) -> None:
+        for callback in self._hooks[name]:
+            callback(*args)
+
+    def lookup(self, outline: StenoOutline) -> Optional[str]:
+        return self.dictionaries.lookup(outline)
+
+    def reverse_lookup(self, translation: str) -> Set[StenoOutline]:
+        return self.dictionaries.reverse_lookup(translation)
+
+
+def build_dictionary(rng: random.Random, size: int) -> FakeDictionary:
+    entries: Dict[StenoOutline, str] = {}
+    while len(entries) < size:
+        outline = random_outline(rng, rng.choice((1, 1, 1, 2, 2, 3)))
+        if rng.random() < 0.1:
+            translation = " ".join(random_word(rng).capitalize() for _ in range(rng.randint(2, 3)))
+        else:
+            translation = random_word(rng)
+
+        entries.setdefault(outline, translation)
+
+    return FakeDictionary(entries)
+
+
+def generate_stream(
+    rng: random.Random,
+    dictionary: FakeDictionary,
+    count: int
+) -> List[Tuple[StenoOutline, str]]:
+    # Mostly words that are already in the dictionary, with unknown words
+    # and runs of capitalized unknown words (names, titles) mixed in
+    words = [(outline, text) for outline, text in dictionary.items() if " " not in text]
+    stream = []
+    while len(stream) < count:
+        roll = rng.random()
+        if roll < 0.75:
+            stream.append(rng.choice(words))
+        elif roll < 0.9:
+            stream.append((random_outline(rng, rng.randint(2, 4)), random_word(rng)))
+        else:
+            for _ in range(rng.randint(2, 4)):
+                stream.append((random_outline(rng, rng.randint(1, 3)), random_word(rng).capitalize()))
+
+    return stream[:count]
+
+
+def read_stream(
+    rng: random.Random,
+    dictionary: FakeDictionary,
+    path: str
+) -> List[Tuple[StenoOutline, str]]:
+    stream = []
+    with open(path, encoding="utf-8", errors="replace") as fp:
+        for line in fp:
+            for word in line.split():
+                outlines = dictionary.reverse.get(word)
+                if outlines:
+                    stream.append((outlines[0], word))
+                else:
+                    stream.append((random_outline(rng, 3), word))
+
+    return stream
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def make_tool(engine: FakeEngine, brief_gen: str):
+    # Only imported now, so the plugin picks up the temporary config dir
+    from plover_autobrief.autobrief_suggestions import AutobriefSuggestions
+
+    tool = AutobriefSuggestions(engine)
+    # Analysis is timed on this thread instead
+    tool._worker.stop()
+
+    tool.config.save_history = False
+    tool.config.autoadd = False
+    tool.config.brief_gen = brief_gen
+    tool.config.brief_gen_builtin = not brief_gen
+    tool.config.brief_gen_process = False
+    tool.config.load_brief_gen()
+    # Loaded up front, so the first stroke doesn't pay for it
+    tool.config.ensure_brief_gen()
+    tool.on_config_changed()
+
+    # The index build is started from a timer, after the first paint
+    while not tool._outline_index.ready:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+
+    return tool
+
+
+def replay(app: QApplication, tool, engine: FakeEngine, stream) -> Dict[str, List[float]]:
+    timings: Dict[str, List[float]] = defaultdict(list)
+    clock = time.perf_counter
+
+    for outline, text in stream:
+        for index, steno in enumerate(outline):
+            if index == len(outline) - 1:
+                engine.translator_state.translations.append(FakeTranslation(outline, text))
+                engine.emit("send_string", " " + text)
+
+            start = clock()
+            engine.emit("stroked", steno)
+            timings["on_stroke"].append(clock() - start)
+
+            # What the analysis worker would do with this stroke
+            snapshot = (
+                tool._buffer.text,
+                tool._buffer.position,
+                engine.translator_state.prev(2)
+            )
+            start = clock()
+            result = tool.find_briefs(snapshot, 1)
+            timings["find_briefs"].append(clock() - start)
+
+            if result:
+                start = clock()
+                tool.on_suggestions_ready(result)
+                timings["on_suggestions_ready"].append(clock() - start)
+
+        start = clock()
+        app.processEvents()
+        timings["table_refresh"].append(clock() - start)
+
+    return timings
+
+
+def time_calls(function, arguments, repeat: int) -> List[float]:
+    clock = time.perf_counter
+    samples = []
+    for _ in range(repeat):
+        for argument in arguments:
+            start = clock()
+            function(*argument)
+            samples.append(clock() - start)
+
+    return samples
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark autobrief's per-stroke cost.")
+    parser.add_argument("--entries", type=int, default=100000, help="synthetic dictionary size")
+    parser.add_argument("--words", type=int, default=5000, help="generated words to replay")
+    parser.add_argument("--text", help="replay the words of this transcript instead")
+    parser.add_argument("--brief-gen", default="", help="briefing script (default: the built-in one)")
+    parser.add_argument("--system", default="English Stenotype")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracemalloc", action="store_true", help="also report the peak Python heap (slower)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    options = parser.parse_args(args)
+
+    rng = random.Random(options.seed)
+    temp_dir = tempfile.TemporaryDirectory(prefix="autobrief-bench-")
+    plover_config.CONFIG_DIR = temp_dir.name
+
+    QSettings.setDefaultFormat(QSettings.IniFormat)
+    QSettings.setPath(QSettings.IniFormat, QSettings.UserScope, temp_dir.name)
+    QCoreApplication.setOrganizationName("autobrief-benchmark")
+    QCoreApplication.setApplicationName("autobrief-benchmark")
+    app = QApplication([])
+
+    registry.update()
+    system.setup(options.system)
+
+    if options.tracemalloc:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    dictionary = build_dictionary(rng, options.entries)
+    engine = FakeEngine(dictionary)
+    tool = make_tool(engine, options.brief_gen)
+    setup_time = time.perf_counter() - start
+
+    if options.text:
+        stream = read_stream(rng, dictionary, options.text)
+    else:
+        stream = generate_stream(rng, dictionary, options.words)
+
+    start = time.perf_counter()
+    timings = replay(app, tool, engine, stream)
+    replay_time = time.perf_counter() - start
+    stroke_count = len(timings["on_stroke"])
+
+    # The two checks on their own, over a mix of hits and misses
+    sample_words = [(text, []) for _, text in rng.sample(stream, min(len(stream), 1000))]
+    sample_outlines = [
+        (outline,) for outline in rng.sample(list(dictionary), min(len(dictionary), 500))
+    ] + [(random_outline(rng, 2),) for _ in range(500)]
+    timings["is_briefable"] = time_calls(tool.is_briefable, sample_words, 5)
+    # Candidates from the briefing script are parsed before they're checked
+    timings["is_valid_brief"] = time_calls(
+        lambda outline: tool.is_valid_brief(tool._validator.outline(outline)),
+        sample_outlines,
+        5
+    )
+
+    results = {
+        "entries": options.entries,
+        "strokes": stroke_count,
+        "words": len(stream),
+        "setup_s": setup_time,
+        "replay_s": replay_time,
+        "strokes_per_s": stroke_count / replay_time if replay_time else 0.0,
+        "suggestions": len(tool._suggestions),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {
+            name: {
+                "calls": len(samples),
+                "p50_us": percentile(samples, 0.5) * 1e6,
+                "p99_us": percentile(samples, 0.99) * 1e6,
+                "max_us": max(samples) * 1e6 if samples else 0.0
+            }
+            for name, samples in timings.items()
+        }
+    }
+
+    if options.tracemalloc:
+        results["peak_heap_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    tool._commits.flush()
+    tool.config.close()
+
+    if options.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{options.entries} entries, {stroke_count} strokes ({len(stream)} words)")
+    print(f"setup {setup_time:.2f}s, replay {replay_time:.2f}s, {results['strokes_per_s']:.0f} strokes/s")
+    print(f"{results['suggestions']} suggestions")
+    if results["peak_rss_mb"] is not None:
+        print(f"peak RSS {results['peak_rss_mb']:.1f} MB")
+    if "peak_heap_mb" in results:
+        print(f"peak Python heap {results['peak_heap_mb']:.1f} MB")
+
+    print()
+    print(f"{'stage':<22}{'calls':>9}{'p50 us':>11}{'p99 us':>11}{'max us':>11}")
+    for name, stage in results["stages"].items():
+        print(
+            f"{name:<22}{stage['calls']:>9}{stage['p50_us']:>11.1f}"
+            f"{stage['p99_us']:>11.1f}{stage['max_us']:>11.1f}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import sys
+
+from collections import Counter, deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from plover import log, system
+from plover.config import Config
+from plover.dictionary.base import load_dictionary
+from plover.formatting import Formatter
+from plover.oslayer.config import CONFIG_FILE
+from plover.registry import registry
+from plover.resource import resource_exists
+from plover.steno import Stroke
+from plover.steno_dictionary import StenoDictionaryCollection
+from plover.translation import Translator
+
+from plover_autobrief.autobrief_buffer import WordBuffer, WORD_RX
+from plover_autobrief.autobrief_cache import ReverseLookupCache
+from plover_autobrief.autobrief_config import AutobriefConfig, CONFIG_ITEMS
+from plover_autobrief.autobrief_index import OutlineIndex
+from plover_autobrief.autobrief_outline import Outline
+from plover_autobrief.autobrief_rules import BriefRules
+from plover_autobrief.autobrief_store import SuggestionStore
+from plover_autobrief.autobrief_validator import StrokeValidator
+
+
+StenoOutline = Tuple[str, ...]
+
+CHUNK_LINES = 2000
+
+# Matches both "Stroke(TEFT : [...])" and the older "Stroke(T- E- -F -T)"
+STROKE_RX = re.compile(r"Stroke\(([^:)]*)")
+
+# Stands in for the word in progress, so the last real word gets analysed
+END_OF_TEXT = " \0"
+
+
+class DictionaryEngine:
+    # Just enough of StenoEngine for the outline index and lookup cache
+    def __init__(self, dictionaries: StenoDictionaryCollection) -> None:
+        self.dictionaries = dictionaries
+
+    def lookup(self, outline: StenoOutline) -> Optional[str]:
+        return self.dictionaries.lookup(outline)
+
+    def reverse_lookup(self, text: str) -> List[StenoOutline]:
+        return self.dictionaries.reverse_lookup(text)
+
+
+class CountingGate:
+    # Counts every occurrence but only lets the first one through, so each
+    # term is briefed once and min_occurrences is checked on the totals
+    # from every chunk.
+    def __init__(self, recent: int = 256) -> None:
+        self.counter: Counter = Counter()
+        self._recent: deque = deque(maxlen=recent)
+        self._recent_set = set()
+
+    def seen(self, term: str, position: int) -> bool:
+        occurrence = (term, position)
+        if occurrence in self._recent_set:
+            return False
+
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_set.discard(self._recent[0])
+        self._recent.append(occurrence)
+        self._recent_set.add(occurrence)
+
+        self.counter[term] += 1
+        return self.counter[term] == 1
+
+    def consume(self, term: str) -> None:
+        # Totals are needed for min_occurrences at the end
+        pass
+
+
+class _BufferOutput:
+    def __init__(self, buffer: WordBuffer) -> None:
+        self.send_string = buffer.send_string
+        self.send_backspaces = buffer.send_backspaces
+        self.send_key_combination = buffer.reset
+
+    def send_engine_command(self, command: str) -> None:
+        pass
+
+
+class BatchScanner:
+    def __init__(self, config: AutobriefConfig, dictionaries: StenoDictionaryCollection) -> None:
+        self.engine = DictionaryEngine(dictionaries)
+        validator = StrokeValidator()
+        outline_index = OutlineIndex(self.engine, validator)
+        outline_index.rebuild(wait=True)
+        self.gate = CountingGate()
+        self.found: Dict[str, Outline] = {}
+        self.rules = BriefRules(
+            config,
+            SuggestionStore(0),
+            outline_index,
+            ReverseLookupCache(self.engine),
+            validator,
+            self.gate
+        )
+
+    def analyse(self, buffer: WordBuffer, recent: list) -> None:
+        snapshot = (buffer.text, buffer.position, recent)
+        for translation, brief in self.rules.find_briefs(snapshot, 1):
+            self.found.setdefault(translation, brief)
+
+    def scan_text(self, lines: Iterable[str]) -> None:
+        buffer = WordBuffer()
+        for line in lines:
+            for word in WORD_RX.findall(line):
+                buffer.send_string(word)
+                self.analyse(buffer, [])
+
+        buffer.send_string(END_OF_TEXT)
+        self.analyse(buffer, [])
+
+    def scan_strokes(self, lines: Iterable[str]) -> None:
+        # Translated the same way as in Plover; only the strokes at the very
+        # start of a chunk are missing what came before them
+        buffer = WordBuffer()
+        translator = Translator()
+        translator.set_dictionary(self.engine.dictionaries)
+        formatter = Formatter()
+        formatter.set_output(_BufferOutput(buffer))
+        translator.add_listener(formatter.format)
+
+        for line in lines:
+            stroke = parse_stroke(line)
+            if stroke is None:
+                continue
+
+            translator.translate(stroke)
+            self.analyse(buffer, list(translator.get_state().prev(2) or []))
+
+        buffer.send_string(END_OF_TEXT)
+        self.analyse(buffer, [])
+
+    def take_results(self) -> Tuple[Counter, Dict[str, Outline]]:
+        results = (self.gate.counter, self.found)
+        self.gate = CountingGate()
+        self.rules.gate = self.gate
+        # Briefs only need to be unique within a chunk here; clashes
+        # between chunks are sorted out by assign_briefs
+        self.rules.pending.clear()
+        self.found = {}
+        return results
+
+
+def parse_stroke(line: str) -> Optional[Stroke]:
+    match = STROKE_RX.search(line)
+    if match is None:
+        return None
+
+    steno = match.group(1).strip()
+    if not steno:
+        return None
+
+    if " " in steno:
+        return Stroke(steno.split())
+
+    return Stroke.from_steno(steno)
+
+
+def plover_config() -> Config:
+    # Plover's defaults stand in for anything it hasn't been set up with;
+    # the system has to be registered before the config can be read
+    config = Config(CONFIG_FILE)
+    if os.path.exists(CONFIG_FILE):
+        config.load()
+
+    return config
+
+
+def enabled_dictionaries(config: Config) -> List[str]:
+    return [
+        dictionary.path
+        for dictionary in config["dictionaries"]
+        if dictionary.enabled
+    ]
+
+
+def load_dictionaries(paths: List[str]) -> StenoDictionaryCollection:
+    return StenoDictionaryCollection([load_dictionary(path) for path in paths])
+
+
+def make_scanner(
+    options: dict,
+    system_name: str,
+    dictionary_paths: List[str]
+) -> BatchScanner:
+    registry.update()
+    system.setup(system_name)
+
+    config = AutobriefConfig(options)
+    # Kept apart from the plugin's cache, which may be for another script
+    # and is written by the running plugin
+    config.brief_cache_path = ":memory:"
+    config.load_brief_gen()
+    return BatchScanner(config, load_dictionaries(dictionary_paths))
+
+
+_scanner: Optional[BatchScanner] = None
+
+
+def _init_worker(options: dict, system_name: str, dictionary_paths: List[str]) -> None:
+    # A failing initializer only gets the worker restarted, over and over,
+    # so the error is kept for the first chunk to report instead
+    global _scanner
+    try:
+        _scanner = make_scanner(options, system_name, dictionary_paths)
+    except Exception:
+        log.error("Autobrief batch worker failed to start", exc_info=True)
+
+
+def _scan_chunk(job: Tuple[bool, List[str]]) -> Tuple[Counter, Dict[str, Outline]]:
+    if _scanner is None:
+        raise RuntimeError("the batch worker failed to start, see the log above")
+
+    strokes, lines = job
+    if strokes:
+        _scanner.scan_strokes(lines)
+    else:
+        _scanner.scan_text(lines)
+
+    return _scanner.take_results()
+
+
+def iter_chunks(paths: List[str], strokes: bool) -> Iterator[Tuple[bool, List[str]]]:
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as fp:
+            while True:
+                lines = list(itertools.islice(fp, CHUNK_LINES))
+                if not lines:
+                    break
+
+                yield strokes, lines
+
+
+def assign_briefs(
+    counts: Counter,
+    found: Dict[str, Outline],
+    min_occurrences: int,
+    rebrief
+) -> Dict[str, str]:
+    # Most frequent terms get first pick; a term whose brief was already
+    # taken by a term from another chunk is briefed again
+    terms = [term for term in found if counts[term] >= min_occurrences]
+    terms.sort(key=lambda term: -counts[term])
+
+    assigned = SuggestionStore(0)
+    for term in terms:
+        brief = found[term]
+        if brief and brief in assigned.briefs:
+            brief = rebrief(term, assigned)
+
+        if brief:
+            assigned.append(term, brief, False)
+
+    return {str(entry.brief): entry.translation for entry in assigned}
+
+
+def parse_option(value: str) -> Tuple[str, object]:
+    key, sep, raw = value.partition("=")
+    if not sep or key not in CONFIG_ITEMS:
+        raise argparse.ArgumentTypeError(f"expected one of the autobrief settings as key=value, got {value!r}")
+
+    _, option_type = CONFIG_ITEMS[key]
+    if option_type is bool:
+        return key, raw.strip().lower() in ("1", "true", "yes", "on")
+
+    try:
+        return key, option_type(raw)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid value for {key}: {raw!r}")
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="autobrief_batch",
+        description="Propose briefs for the words and phrases in transcripts or stroke logs."
+    )
+    parser.add_argument("files", nargs="+", help="plain text transcripts, or Plover stroke logs with --strokes")
+    parser.add_argument("-o", "--output", help="JSON dictionary to write (default: stdout)")
+    parser.add_argument("--strokes", action="store_true", help="the files are Plover stroke logs")
+    parser.add_argument("-d", "--dictionary", action="append", help="dictionary to check against, highest priority first (default: Plover's enabled dictionaries)")
+    parser.add_argument("--system", help="steno system the dictionaries are for (default: Plover's)")
+    parser.add_argument("--brief-gen", help="briefing script (default: the built-in one)")
+    parser.add_argument("-j", "--processes", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--set", type=parse_option, action="append", default=[], metavar="KEY=VALUE", help="any other autobrief setting, e.g. min_occurrences=3")
+    options = parser.parse_args(args)
+
+    registry.update()
+    config = plover_config()
+    system_name = options.system or config["system_name"]
+    if system_name not in {plugin.name for plugin in registry.list_plugins("system")}:
+        parser.error(f"unknown steno system {system_name!r}")
+
+    # Plover's default user dictionary only exists once Plover has run
+    dictionary_paths = []
+    for path in options.dictionary or enabled_dictionaries(config):
+        if resource_exists(path):
+            dictionary_paths.append(path)
+        else:
+            print(f"skipping missing dictionary {path}", file=sys.stderr)
+
+    settings = dict(options.set)
+    if options.brief_gen:
+        settings["brief_gen"] = options.brief_gen
+        settings["brief_gen_builtin"] = False
+    elif not settings.get("brief_gen"):
+        settings["brief_gen_builtin"] = True
+
+    # The scan already runs in worker processes
+    settings["brief_gen_process"] = False
+    min_occurrences = AutobriefConfig(settings).min_occurrences
+
+    counts: Counter = Counter()
+    found: Dict[str, Outline] = {}
+    init_args = (settings, system_name, dictionary_paths)
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(max(1, options.processes), _init_worker, init_args) as pool:
+        for chunk_counts, chunk_found in pool.imap(_scan_chunk, iter_chunks(options.files, options.strokes)):
+            counts.update(chunk_counts)
+            for term, brief in chunk_found.items():
+                found.setdefault(term, brief)
+
+    # Only needed when chunks clash, which is rare
+    scanner: List[BatchScanner] = []
+
+    def rebrief(term: str, assigned: SuggestionStore) -> Outline:
+        if not scanner:
+            scanner.append(make_scanner(*init_args))
+
+        scanner[0].rules.suggestions = assigned
+        _, brief = scanner[0].rules.brief_text(term)
+        return brief
+
+    dictionary = assign_briefs(counts, found, min_occurrences, rebrief)
+    output = json.dumps(dictionary, ensure_ascii=False, indent=0, sort_keys=True)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as fp:
+            fp.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+    print(f"{len(dictionary)} of {len(found)} briefable terms briefed", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
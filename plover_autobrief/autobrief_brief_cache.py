@@ -0,0 +1,141 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from typing import Dict, List, Optional, Tuple
+
+from plover import log
+
+from plover_autobrief.autobrief_cache import LRUCache
+
+
+# Rows from other scripts are kept this long after they were written, so
+# switching back and forth between scripts doesn't start over each time
+MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+# Oldest rows go first beyond this many
+MAX_ROWS = 100000
+
+
+class BriefCache:
+    def __init__(
+        self,
+        path: str,
+        max_size: int = 2048,
+        max_rows: int = MAX_ROWS,
+        max_age: float = MAX_AGE_SECONDS
+    ) -> None:
+        self.path = path
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.source_hash = ""
+        self._memory = LRUCache(max_size)
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS briefs ("
+                "source TEXT, text TEXT, briefs TEXT, used REAL DEFAULT 0, "
+                "PRIMARY KEY (source, text))"
+            )
+            # Caches from before rows were timestamped
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(briefs)")]
+            if "used" not in columns:
+                self._db.execute("ALTER TABLE briefs ADD COLUMN used REAL DEFAULT 0")
+
+        return self._db
+
+    def set_source(self, source: str) -> None:
+        source_hash = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        if source_hash == self.source_hash:
+            return
+
+        self.source_hash = source_hash
+        self._memory.clear()
+
+        try:
+            with self._lock:
+                self._prune(source_hash)
+        except sqlite3.Error:
+            log.warning("Autobrief brief cache unavailable", exc_info=True)
+
+    def _prune(self, source_hash: str) -> None:
+        # Other scripts' rows stay until they're old, and the whole cache is
+        # kept to max_rows; only done when a script is loaded
+        db = self._connect()
+        with db:
+            db.execute(
+                "DELETE FROM briefs WHERE source != ? AND used < ?",
+                (source_hash, time.time() - self.max_age)
+            )
+            excess = db.execute("SELECT COUNT(*) FROM briefs").fetchone()[0] - self.max_rows
+            if excess > 0:
+                db.execute(
+                    "DELETE FROM briefs WHERE rowid IN "
+                    "(SELECT rowid FROM briefs ORDER BY used, rowid LIMIT ?)",
+                    (excess,)
+                )
+
+    def get(self, text: str) -> Optional[Tuple[List[Tuple[str, ...]], bool]]:
+        # Returns the briefs pulled so far and whether the script ran out
+        entry = self._memory.get(text)
+        if entry is not None:
+            return entry
+
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT briefs FROM briefs WHERE source = ? AND text = ?",
+                    (self.source_hash, text)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+
+        if row is None:
+            return None
+
+        stored = json.loads(row[0])
+        if isinstance(stored, list):
+            stored = {"briefs": stored, "complete": True}
+
+        entry = ([tuple(brief) for brief in stored["briefs"]], stored["complete"])
+        self._memory.put(text, entry)
+        return entry
+
+    def put(
+        self,
+        text: str,
+        briefs: List[Tuple[str, ...]],
+        complete: bool = True,
+        source_hash: Optional[str] = None
+    ) -> None:
+        # Results from a script that was replaced while it ran are dropped
+        if source_hash is not None and source_hash != self.source_hash:
+            return
+
+        self._memory.put(text, (briefs, complete))
+        try:
+            with self._lock:
+                db = self._connect()
+                with db:
+                    db.execute(
+                        "INSERT OR REPLACE INTO briefs (source, text, briefs, used) "
+                        "VALUES (?, ?, ?, ?)",
+                        (
+                            self.source_hash,
+                            text,
+                            json.dumps({"briefs": briefs, "complete": complete}),
+                            time.time()
+                        )
+                    )
+        except sqlite3.Error:
+            log.warning("Autobrief brief cache unavailable", exc_info=True)
+
+    def stats(self) -> Dict[str, int]:
+        return self._memory.stats()
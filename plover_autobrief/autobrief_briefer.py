@@ -0,0 +1,307 @@
+"""
+Built-in briefing script. It guesses outlines from spelling alone, so
+it's no replacement for a proper theory-aware script, but it's quick
+and gives every word a handful of sensible candidates to try.
+
+This file is also loaded on its own by the worker processes, so it
+should only ever import from the standard library.
+"""
+
+import re
+
+from typing import FrozenSet, Iterator, List, Tuple
+
+
+LEFT_ORDER = "STKPWHR"
+VOWEL_ORDER = "AO*EU"
+RIGHT_ORDER = "FRPBLGTSDZ"
+
+LEFT_CHORDS = {
+    "b": "PW", "bl": "PWHR", "br": "PWR", "c": "K", "ch": "KH",
+    "chr": "KR", "cl": "KHR", "cr": "KR", "d": "TK", "dr": "TKR",
+    "f": "TP", "fl": "TPHR", "fr": "TPR", "g": "TKPW", "gl": "TKPWHR",
+    "gr": "TKPWR", "h": "H", "j": "SKWR", "k": "K", "kn": "TPH",
+    "l": "HR", "m": "PH", "n": "TPH", "p": "P", "ph": "TP", "pl": "PHR",
+    "pr": "PR", "qu": "KW", "q": "KW", "r": "R", "s": "S", "sc": "SK",
+    "scr": "SKR", "sh": "SH", "shr": "SHR", "sk": "SK", "sl": "SHR",
+    "sm": "SPH", "sn": "STPH", "sp": "SP", "sph": "STP", "spl": "SPHR",
+    "spr": "SPR", "st": "ST", "str": "STR", "sw": "SW", "t": "T",
+    "th": "TH", "thr": "THR", "tr": "TR", "tw": "TW", "v": "SR", "w": "W",
+    "wh": "WH", "wr": "R", "x": "KP", "y": "KWR", "z": "STKPW"
+}
+
+RIGHT_CHORDS = {
+    "b": "B", "bs": "BS", "c": "BG", "ch": "FP", "ck": "BG", "ct": "BGT",
+    "d": "D", "f": "F", "ff": "F", "ft": "FT", "g": "G", "ge": "PBLG",
+    "gh": "", "j": "PBLG", "k": "BG", "l": "L", "ld": "LD", "lf": "LF",
+    "ll": "L", "lt": "LT", "m": "PL", "mp": "FRP", "n": "PB", "nch": "FRPBLG",
+    "nd": "PBD", "ng": "PBG", "nk": "PBG", "ns": "PBS", "nt": "PBT",
+    "p": "P", "pt": "PT", "r": "R", "rch": "FRPB", "rd": "RD", "rs": "RS",
+    "rt": "RT", "s": "S", "sh": "RB", "ss": "S", "st": "*S", "t": "T",
+    "tch": "FP", "th": "*T", "ts": "TS", "tt": "T", "v": "F", "ve": "F",
+    "x": "BGS", "z": "Z", "zz": "Z"
+}
+
+VOWEL_CHORDS = {
+    "a": "A", "ai": "AEU", "au": "AU", "aw": "AU", "ay": "AEU",
+    "e": "E", "ea": "AE", "ee": "AOE", "ei": "AEU", "eu": "AOU",
+    "ew": "AOU", "i": "EU", "ie": "AOE", "o": "O", "oa": "OE",
+    "oe": "OE", "oi": "OEU", "oo": "AO", "ou": "OU", "ow": "OU",
+    "oy": "OEU", "u": "U", "ue": "AOU", "ui": "AOU", "y": "EU"
+}
+
+PREFIX_STROKES = {
+    "con": "KAUPB", "com": "KOPL", "de": "TKE", "dis": "TKEUS",
+    "en": "EPB", "ex": "EBGS", "in": "EUPB", "inter": "SPWER",
+    "mis": "PHEUS", "non": "TPHOPB", "over": "AUFR", "pre": "PRE",
+    "pro": "PRO", "re": "RE", "sub": "SUB", "trans": "TRA*PBS",
+    "un": "UPB", "under": "UPBD"
+}
+
+SUFFIX_STROKES = {
+    "able": "-BL", "al": "-L", "ed": "-D", "er": "-R", "ers": "-RS",
+    "es": "-S", "ful": "-FL", "ible": "-BL", "ing": "-G", "ings": "-GS",
+    "ion": "-GS", "ism": "-FPL", "ist": "-FT", "ity": "TEU", "less": "-LS",
+    "ly": "-LG", "ment": "-PLT", "ments": "-PLTS", "ness": "-PBS",
+    "ous": "-S", "s": "-S", "sion": "-GS", "tion": "-GS", "tions": "-GSZ"
+}
+
+# Right-bank stand-ins for a word's initial letter, used for phrases
+INITIAL_RIGHT = {
+    "b": "B", "c": "BG", "ch": "FP", "d": "D", "f": "F", "g": "G",
+    "j": "PBLG", "k": "BG", "l": "L", "m": "PL", "n": "PB", "p": "P",
+    "r": "R", "s": "S", "sh": "RB", "t": "T", "v": "F", "x": "BGS",
+    "z": "Z"
+}
+
+# Suffix chords that can be folded into the last stroke of a word
+FOLDABLE = ("D", "G", "S", "Z")
+
+VOWEL_LETTERS = frozenset("aeiouy")
+SEGMENT_RX = re.compile(r"[aeiouy]+|[^aeiouy]+")
+
+Chord = FrozenSet[str]
+Stroke = Tuple[Chord, Chord, Chord]
+
+
+def _split_chord(value: str) -> Stroke:
+    left, vowels, right = set(), set(), set()
+    if value.startswith("-"):
+        right.update(value[1:])
+        return frozenset(left), frozenset(vowels), frozenset(right)
+
+    bank = left
+    for key in value:
+        if key in VOWEL_ORDER:
+            vowels.add(key)
+            bank = right
+        else:
+            bank.add(key)
+
+    return frozenset(left), frozenset(vowels), frozenset(right)
+
+
+def _right_chord(value: str) -> Tuple[Chord, Chord]:
+    star = frozenset("*") if "*" in value else frozenset()
+    return star, frozenset(value.replace("*", ""))
+
+
+LEFT = {k: frozenset(v) for k, v in LEFT_CHORDS.items()}
+RIGHT = {k: _right_chord(v) for k, v in RIGHT_CHORDS.items()}
+VOWELS = {k: frozenset(v) for k, v in VOWEL_CHORDS.items()}
+PREFIXES = {k: _split_chord(v) for k, v in PREFIX_STROKES.items()}
+SUFFIXES = {k: _split_chord(v) for k, v in SUFFIX_STROKES.items()}
+INITIALS = {k: frozenset(v) for k, v in INITIAL_RIGHT.items()}
+
+MAX_LEFT = max(len(k) for k in LEFT)
+MAX_RIGHT = max(len(k) for k in RIGHT)
+PREFIX_ORDER = sorted(PREFIXES, key=len, reverse=True)
+SUFFIX_ORDER = sorted(SUFFIXES, key=len, reverse=True)
+
+EMPTY: Chord = frozenset()
+STAR: Chord = frozenset("*")
+
+
+def render(stroke: Stroke) -> str:
+    left, vowels, right = stroke
+    left_str = "".join(k for k in LEFT_ORDER if k in left)
+    vowel_str = "".join(k for k in VOWEL_ORDER if k in vowels)
+    right_str = "".join(k for k in RIGHT_ORDER if k in right)
+
+    if right_str and not vowel_str:
+        return f"{left_str}-{right_str}"
+
+    return left_str + vowel_str + right_str
+
+
+def _match_left(cluster: str) -> Chord:
+    # Longest known onset, anything after it is dropped
+    for length in range(min(len(cluster), MAX_LEFT), 0, -1):
+        chord = LEFT.get(cluster[:length])
+        if chord is not None:
+            return chord
+
+    return EMPTY
+
+
+def _match_right(cluster: str) -> Tuple[Chord, Chord]:
+    star, keys = set(), set()
+    index = 0
+    while index < len(cluster):
+        for length in range(min(len(cluster) - index, MAX_RIGHT), 0, -1):
+            chord = RIGHT.get(cluster[index:index + length])
+            if chord is not None:
+                star.update(chord[0])
+                keys.update(chord[1])
+                index += length
+                break
+        else:
+            index += 1
+
+    return frozenset(star), frozenset(keys)
+
+
+def _match_vowel(group: str) -> Chord:
+    chord = VOWELS.get(group)
+    if chord is None:
+        chord = VOWELS.get(group[:2]) or VOWELS.get(group[0], EMPTY)
+
+    return chord
+
+
+def _segments(word: str) -> Tuple[str, List[str], List[str]]:
+    # onset, vowel groups, and the consonant cluster following each group
+    parts = SEGMENT_RX.findall(word)
+    onset = ""
+    if parts and parts[0][0] not in VOWEL_LETTERS:
+        onset = parts.pop(0)
+
+    # A leading "y" is a consonant, as is a final silent "e"
+    if onset == "" and word.startswith("y") and len(parts) > 1:
+        onset, parts[0] = "y", parts[0][1:]
+        if not parts[0]:
+            parts.pop(0)
+
+    vowels = parts[0::2]
+    codas = parts[1::2]
+    if len(codas) < len(vowels):
+        codas.append("")
+
+    if len(vowels) > 1 and vowels[-1] == "e" and codas[-1] == "":
+        vowels.pop()
+        codas.pop()
+        codas[-1] += "e"
+
+    return onset, vowels, codas
+
+
+def _stroke(onset: str, vowel: str, coda: str, star: bool = False) -> Stroke:
+    coda_star, right = _match_right(coda)
+    vowels = _match_vowel(vowel) if vowel else EMPTY
+    if star or coda_star:
+        vowels = vowels | STAR
+
+    return _match_left(onset), vowels, right
+
+
+def _word_strokes(word: str) -> Iterator[Tuple[Stroke, ...]]:
+    onset, vowels, codas = _segments(word)
+    if not vowels:
+        yield ((_match_left(onset), EMPTY, _match_right(word[len(onset):])[1]),)
+        return
+
+    first, last = vowels[0], vowels[-1]
+    # Words ending in a vowel are briefed on their last consonants
+    final = codas[-1] or (codas[-2] if len(codas) > 1 else "")
+
+    yield (_stroke(onset, first, final),)
+    yield (_stroke(onset, first, final, star=True),)
+    yield (_stroke(onset, "", final),)
+    if last != first:
+        yield (_stroke(onset, last, final),)
+
+    yield (_stroke(onset, first, codas[0]),)
+
+    if len(vowels) > 1:
+        # First syllable, then the rest of the word from the last vowel
+        split = codas[-2]
+        tail_onset = split[-1] if split else ""
+        yield (
+            _stroke(onset, first, split[:-1] if split else ""),
+            _stroke(tail_onset, last, codas[-1])
+        )
+
+
+def _with_affixes(word: str) -> Iterator[Tuple[Stroke, ...]]:
+    for suffix in SUFFIX_ORDER:
+        base = word[:-len(suffix)]
+        if word.endswith(suffix) and len(base) >= 3:
+            suffix_stroke = SUFFIXES[suffix]
+            for outline in _word_strokes(base):
+                left, vowels, right = outline[-1]
+                folded = suffix_stroke[2]
+                if folded and all(k in FOLDABLE for k in folded) and not (right & folded):
+                    yield outline[:-1] + ((left, vowels, right | folded),)
+
+                yield outline + (suffix_stroke,)
+            break
+
+    for prefix in PREFIX_ORDER:
+        rest = word[len(prefix):]
+        if word.startswith(prefix) and len(rest) >= 3:
+            for outline in _word_strokes(rest):
+                yield (PREFIXES[prefix],) + outline
+            break
+
+
+def _disambiguated(outline: Tuple[Stroke, ...]) -> Iterator[Tuple[Stroke, ...]]:
+    left, vowels, right = outline[-1]
+    if "*" not in vowels:
+        yield outline[:-1] + ((left, vowels | STAR, right),)
+
+    for key in ("D", "Z"):
+        if key not in right:
+            yield outline[:-1] + ((left, vowels, right | frozenset(key)),)
+
+
+def _phrase_strokes(words: List[str]) -> Iterator[Tuple[Stroke, ...]]:
+    first_onset, first_vowels, _ = _segments(words[0])
+    last_onset, _, _ = _segments(words[-1])
+    left = _match_left(first_onset)
+    right = INITIALS.get(last_onset[:2]) or INITIALS.get(last_onset[:1], EMPTY)
+
+    yield ((left, STAR, right),)
+    if first_vowels:
+        yield ((left, _match_vowel(first_vowels[0]), right),)
+
+    if len(words) <= 4:
+        yield tuple(next(_word_strokes(word))[0] for word in words)
+
+
+def _outlines(text: str) -> Iterator[Tuple[Stroke, ...]]:
+    words = [re.sub(r"[^a-z]", "", word) for word in text.lower().split()]
+    words = [word for word in words if word]
+    if not words:
+        return
+
+    if len(words) > 1:
+        yield from _phrase_strokes(words)
+        return
+
+    word = words[0]
+    primary = list(_word_strokes(word))
+    yield from primary
+    yield from _with_affixes(word)
+    for outline in primary:
+        yield from _disambiguated(outline)
+
+
+def get_briefs(text: str) -> Iterator[Tuple[str, ...]]:
+    seen = set()
+    for outline in _outlines(text):
+        rendered = tuple(render(stroke) for stroke in outline)
+        if rendered in seen or not all(rendered):
+            continue
+
+        seen.add(rendered)
+        yield rendered
@@ -0,0 +1,58 @@
+import re
+
+from typing import List
+
+
+# Same word pattern as plover.formatting.RetroFormatter
+WORD_RX = re.compile(r"(?:\w+|[^\w\s]+)\s*")
+
+MAX_CHARS = 4096
+
+
+def last_words(text: str, count: int) -> List[str]:
+    # Only scan as far back as needed to find count words; one extra word
+    # is matched so the first one returned isn't cut off by the window.
+    window = 32 * (count + 1)
+    while True:
+        start = max(0, len(text) - window)
+        words = WORD_RX.findall(text, start)
+        if start == 0:
+            return words[-count:]
+
+        if len(words) > count:
+            return words[-count:]
+
+        window *= 2
+
+
+class WordBuffer:
+    def __init__(self, max_chars: int = MAX_CHARS) -> None:
+        self.max_chars = max_chars
+        self.text = ""
+        # Total length of the output so far, including trimmed text
+        self.position = 0
+
+    def send_string(self, text: str) -> None:
+        self.text += text
+        self.position += len(text)
+        # Trim in bulk so appends stay cheap
+        if len(self.text) > 2 * self.max_chars:
+            self.text = self.text[-self.max_chars:]
+
+    def send_backspaces(self, count: int) -> None:
+        if count <= 0:
+            return
+
+        self.position -= count
+        if count >= len(self.text):
+            self.text = ""
+        else:
+            self.text = self.text[:-count]
+
+    def reset(self, *args) -> None:
+        # Cursor movement and other key combinations make the buffer
+        # useless for working out what was just written
+        self.text = ""
+
+    def last_words(self, count: int) -> List[str]:
+        return last_words(self.text, count)
@@ -0,0 +1,104 @@
+import threading
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from plover.engine import StenoEngine
+
+
+_MISSING = object()
+
+
+def dictionary_fingerprint(engine: StenoEngine) -> Tuple:
+    # Plover doesn't signal edits made outside this plugin (e.g. the add
+    # translation dialog). New and deleted entries change a dictionary's
+    # length, and a reload from disk changes its timestamp; an entry
+    # overwritten in place is only caught once the dictionary is reloaded,
+    # which also rebuilds everything through dictionaries_loaded.
+    return tuple(
+        (id(dic), dic.enabled, len(dic), getattr(dic, "timestamp", None))
+        for dic in engine.dictionaries.dicts
+    )
+
+
+class LRUCache:
+    def __init__(self, max_size: int = 4096) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[Hashable], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute(key)
+            self.put(key, value)
+
+        return value
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+class ReverseLookupCache(LRUCache):
+    def __init__(self, engine: StenoEngine, max_size: int = 4096) -> None:
+        super().__init__(max_size)
+        self.engine = engine
+        self._fingerprint: Tuple = ()
+
+    def _compute(self, text: str) -> Tuple[Tuple[str, ...], ...]:
+        # Misses are stored as an empty tuple, so they're cached too
+        return tuple(self.engine.reverse_lookup(text) or ())
+
+    def lookup(self, text: str) -> Tuple[Tuple[str, ...], ...]:
+        return self.get_or_compute(text, self._compute)
+
+    def validate(self) -> None:
+        fingerprint = dictionary_fingerprint(self.engine)
+        if fingerprint != self._fingerprint:
+            self.clear()
+            self._fingerprint = fingerprint
+
+    def invalidate(self, text: str) -> None:
+        # Precise invalidation for commits made by the plugin itself; the
+        # fingerprint is refreshed so the commit doesn't flush everything.
+        self.discard(text)
+        self.discard(text.lower())
+        self._fingerprint = dictionary_fingerprint(self.engine)
@@ -0,0 +1,80 @@
+from PyQt5.QtCore import QObject, QTimer
+
+from typing import Callable, List, Tuple
+
+from plover import log
+from plover.engine import StenoEngine
+
+
+StenoOutline = Tuple[str, ...]
+
+# Flush once strokes stop for this long, or once the oldest pending
+# commit has waited this long, or once this many are pending
+IDLE_MS = 2000
+MAX_DELAY_MS = 30000
+MAX_PENDING = 25
+
+
+class CommitQueue(QObject):
+    def __init__(
+        self,
+        engine: StenoEngine,
+        on_flushed: Callable[[List[Tuple[StenoOutline, str]]], None],
+        parent=None
+    ) -> None:
+        super().__init__(parent)
+        self.engine = engine
+        self._on_flushed = on_flushed
+        self._pending: List[Tuple[StenoOutline, str, str]] = []
+
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.timeout.connect(self.flush)
+
+        self._delay_timer = QTimer(self)
+        self._delay_timer.setSingleShot(True)
+        self._delay_timer.timeout.connect(self.flush)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, brief: StenoOutline, translation: str, dictionary_path: str) -> None:
+        self._pending.append((brief, translation, dictionary_path))
+        if len(self._pending) >= MAX_PENDING:
+            self.flush()
+            return
+
+        if not self._delay_timer.isActive():
+            self._delay_timer.start(MAX_DELAY_MS)
+        self._idle_timer.start(IDLE_MS)
+
+    def poke(self) -> None:
+        # Called on every stroke, so the idle flush waits for a pause
+        if self._pending:
+            self._idle_timer.start(IDLE_MS)
+
+    def flush(self, *args) -> None:
+        self._idle_timer.stop()
+        self._delay_timer.stop()
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        dictionaries = self.engine.dictionaries
+        paths = set()
+
+        # Same as engine.add_translation, but with one save per dictionary
+        try:
+            with self.engine:
+                for brief, translation, path in pending:
+                    if not path:
+                        path = dictionaries.first_writable().path
+
+                    dictionaries.set(brief, translation, path=path)
+                    paths.add(path)
+
+                dictionaries.save(path_list=tuple(paths))
+        except Exception:
+            log.error("Autobrief failed to save briefs", exc_info=True)
+
+        self._on_flushed([(brief, translation) for brief, translation, _ in pending])
@@ -1,4 +1,15 @@
-from typing import Callable, List, Tuple
+import itertools
+import os
+import threading
+
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from plover import log
+from plover.oslayer.config import CONFIG_DIR
+
+from plover_autobrief.autobrief_loader import (
+    BriefGenError, compile_source, file_stamp, load_get_briefs
+)
 
 
 CONFIG_ITEMS = {
@@ -10,13 +21,28 @@ CONFIG_ITEMS = {
     "exclude_chars": ("()'\",.", str),
     "to_dict": ("", str),
     "brief_gen": ("", str), 
+    "brief_gen_builtin": (False, bool),
+    "brief_gen_process": (False, bool),
+    "brief_gen_timeout": (200, int),
+    "brief_budget": (0, int),
     "min_length": (4, int),
     "min_strokes": (4, int),
     "search_depth": (6, int),
     "row_height": (30, int),
-    "page_len": (10, int)
+    "page_len": (10, int),
+    "max_suggestions": (1000, int),
+    "max_refresh_rate": (20, int),
+    "pause_hidden": (True, bool),
+    "min_occurrences": (1, int),
+    "save_history": (True, bool),
+    "collect_stats": (False, bool),
+    "prep_list": ("", str)
 }
 
+BRIEF_CACHE_FILE = "autobrief_briefs.db"
+BRIEF_GEN_WORKERS = 2
+BUILTIN_BRIEF_GEN = os.path.join(os.path.dirname(__file__), "autobrief_briefer.py")
+
 
 class AutobriefConfig:
     def __init__(self, values: dict = None) -> None:
@@ -29,33 +55,220 @@ class AutobriefConfig:
             else:
                 setattr(self, key, default)
 
+        self.brief_cache_path = os.path.join(CONFIG_DIR, BRIEF_CACHE_FILE)
+        self._get_briefs = None
+        self._pool = None
+        self._brief_gen_stamp = None
+        self._brief_gen_pending = False
+        self._load_lock = threading.Lock()
+        self._ensure_lock = threading.Lock()
+        self._generation = 0
+        # In-process script failures; the pool counts its own
+        self._errors = 0
+        self._error_logged = False
+
     def copy(self) -> "AutobriefConfig":
         value_dict = {k: getattr(self, k) for k in CONFIG_ITEMS.keys()}
-        return AutobriefConfig(value_dict)
+        config = AutobriefConfig(value_dict)
+        config.brief_cache_path = self.brief_cache_path
+        if hasattr(self, "_brief_cache"):
+            config._brief_cache = self._brief_cache
+
+        return config
+
+    def brief_gen_path(self) -> str:
+        if self.brief_gen_builtin:
+            return BUILTIN_BRIEF_GEN
+
+        return self.brief_gen
 
     def load_brief_gen(self) -> None:
-        if hasattr(self, "brief_gen") and self.brief_gen:
-            try:
-                with open(self.brief_gen, encoding="utf-8") as fp:
-                    source = fp.read()
-                
-                globs = {}
-                exec(source, globs)
-                
-                get_briefs = globs.get("get_briefs")
-                if not isinstance(get_briefs, Callable):
-                    self._get_briefs = None
-                
-                self._get_briefs = get_briefs
-            
-            except (FileNotFoundError, OSError) as _:
-                self._get_briefs = None
+        # The script itself is only loaded once briefs are first needed,
+        # which happens on the analysis worker rather than at startup
+        self.close()
+        self._get_briefs = None
+        self._brief_gen_stamp = None
+        self._brief_gen_pending = True
+
+    def ensure_brief_gen(self) -> None:
+        if not self._brief_gen_pending:
+            return
+
+        with self._ensure_lock:
+            if not self._brief_gen_pending:
+                return
+
+            brief_gen = self.brief_gen_path()
+            if brief_gen:
+                self._swap_brief_gen(brief_gen)
+            self._brief_gen_pending = False
+
+    def brief_gen_changed(self) -> bool:
+        # Only a stat call, cheap enough to poll from a timer
+        if self._brief_gen_pending:
+            return False
+
+        brief_gen = self.brief_gen_path()
+        return bool(brief_gen) and file_stamp(brief_gen) != self._brief_gen_stamp
+
+    def reload_brief_gen(self) -> bool:
+        # The script currently in use is kept if the new version fails
+        brief_gen = self.brief_gen_path()
+        if not brief_gen or not self._swap_brief_gen(brief_gen):
+            return False
+
+        log.info(f"Autobrief reloaded {brief_gen}")
+        return True
+
+    def _swap_brief_gen(self, brief_gen: str) -> bool:
+        with self._load_lock:
+            generation = self._generation
+
+        # Recorded even if the load fails, so it's only retried once the
+        # file changes again
+        self._brief_gen_stamp = file_stamp(brief_gen)
+        pool = None
+        try:
+            with open(brief_gen, "rb") as fp:
+                source = fp.read()
+
+            # The script is loaded by the worker processes instead, from
+            # the bytecode compiled here
+            if self.brief_gen_process:
+                from plover_autobrief.autobrief_pool import BriefGenPool
+
+                compile_source(source, brief_gen)
+                pool = BriefGenPool(
+                    brief_gen,
+                    BRIEF_GEN_WORKERS,
+                    self.brief_gen_timeout / 1000
+                )
+                if not pool.check():
+                    pool.close()
+                    pool = None
+                    raise BriefGenError(f"{brief_gen} failed to load in a worker process")
+
+                get_briefs = pool.call
+            else:
+                get_briefs = load_get_briefs(brief_gen, source=source)
+
+        except (OSError, SyntaxError, ValueError, BriefGenError):
+            log.warning(f"Autobrief couldn't load {brief_gen}", exc_info=True)
+            return False
+
+        with self._load_lock:
+            # Closed or reloaded again while this was loading
+            if generation != self._generation:
+                if pool is not None:
+                    pool.close()
+                return False
+
+            if not hasattr(self, "_brief_cache"):
+                from plover_autobrief.autobrief_brief_cache import BriefCache
+
+                self._brief_cache = BriefCache(self.brief_cache_path)
+            self._brief_cache.set_source(source.decode("utf-8", "replace"))
+
+            old_pool = self._pool
+            self._pool = pool
+            self._get_briefs = get_briefs
+            self._generation += 1
+            self._error_logged = False
+
+        if old_pool is not None:
+            old_pool.close()
+
+        return True
     
+    def _generate(self, text: str, limit: int = 0) -> Optional[Iterable[Tuple[str, ...]]]:
+        if self._pool is not None:
+            return self._pool.call(text, limit)
+
+        briefs = self._get_briefs(text)
+        if limit and briefs is not None:
+            return itertools.islice(briefs, limit)
+
+        return briefs
+
+    def iter_briefs(self, text: str) -> Iterator[Tuple[str, ...]]:
+        # Scripts may return a list or yield briefs lazily; either way briefs
+        # are only pulled until the caller stops asking for more.
+        if self.no_briefer():
+            return
+
+        source_hash = self._brief_cache.source_hash
+        cached = self._brief_cache.get(text)
+        if cached is not None:
+            pulled, complete = cached
+            yield from pulled
+            if complete:
+                return
+        else:
+            pulled = []
+
+        limit = self.brief_budget
+        try:
+            briefs = self._generate(text, limit)
+        except Exception:
+            self._script_failed(text)
+            return
+
+        # Timed out or crashed in the worker pool, try again next time
+        if briefs is None:
+            return
+
+        pulled = list(pulled)
+        skip = len(pulled)
+        generated = 0
+        complete = False
+        failed = False
+        try:
+            for brief in briefs:
+                generated += 1
+                if generated <= skip:
+                    continue
+
+                brief = tuple(brief)
+                pulled.append(brief)
+                yield brief
+
+            # Stopping at the budget doesn't mean the script had no more,
+            # so a later, larger budget can still get them
+            complete = not limit or generated < limit
+        except Exception:
+            # Like a failure in the worker pool: no more briefs for this
+            # term, and nothing cached, so it's tried again next time
+            failed = True
+            self._script_failed(text)
+        finally:
+            if not failed:
+                self._brief_cache.put(text, pulled, complete, source_hash)
+
+    def _script_failed(self, text: str) -> None:
+        # Logged once per version of the script, so a broken script
+        # doesn't flood the log on every word
+        self._errors += 1
+        if not self._error_logged:
+            self._error_logged = True
+            log.warning(f"Autobrief's briefing script failed on {text!r}", exc_info=True)
+
+    @property
+    def brief_gen_errors(self) -> int:
+        pool = self._pool
+        return self._errors + (pool.errors if pool is not None else 0)
+
     def get_briefs(self, text: str) -> List[Tuple[str, ...]]:
-        if hasattr(self, "_get_briefs") and self._get_briefs is not None:
-            return self._get_briefs(text)
-        
-        return []
+        return list(self.iter_briefs(text))
+
+    def close(self) -> None:
+        with self._load_lock:
+            self._generation += 1
+            pool = self._pool
+            self._pool = None
+
+        if pool is not None:
+            pool.close()
 
     def no_briefer(self) -> bool:
-        return not (hasattr(self, "_get_briefs") and self._get_briefs is not None)
+        self.ensure_brief_gen()
+        return self._get_briefs is None
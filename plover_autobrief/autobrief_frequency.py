@@ -0,0 +1,99 @@
+import heapq
+import itertools
+import threading
+
+from collections import deque
+from typing import Container, Dict, Hashable, List, Tuple
+
+
+class SpaceSaving:
+    # Space-saving top-k counter: at most capacity keys are tracked, and a
+    # new key takes over the slot of the least frequent one, inheriting its
+    # count. Estimates only ever overcount, by at most the inherited amount.
+    def __init__(self, capacity: int = 5000) -> None:
+        self.capacity = capacity
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._heap: List[Tuple[int, int, str]] = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def _push(self, key: str) -> None:
+        heapq.heappush(self._heap, (self._counts[key], next(self._order), key))
+        # Drop stale heap entries once they outnumber the live ones
+        if len(self._heap) > 4 * max(self.capacity, 1):
+            self._heap = [
+                (count, order, key)
+                for count, order, key in self._heap
+                if self._counts.get(key) == count
+            ]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[str, int]:
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            if self._counts.get(key) == count:
+                return key, count
+
+    def add(self, key: str) -> int:
+        with self._lock:
+            if key in self._counts:
+                self._counts[key] += 1
+            elif len(self._counts) < self.capacity:
+                self._counts[key] = 1
+                self._errors[key] = 0
+            else:
+                evicted, count = self._pop_min()
+                del self._counts[evicted]
+                del self._errors[evicted]
+                self._counts[key] = count + 1
+                self._errors[key] = count
+
+            self._push(key)
+            return self._counts[key]
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._counts.pop(key, None)
+            self._errors.pop(key, None)
+
+    def top(self, count: int = 10, exclude: Container[str] = ()) -> List[Tuple[str, int]]:
+        with self._lock:
+            items = [item for item in self._counts.items() if item[0] not in exclude]
+
+        return heapq.nlargest(count, items, key=lambda item: item[1])
+
+
+class OccurrenceGate:
+    # Lets a term through once it has been seen min_count times. The same
+    # occurrence can be analysed more than once (e.g. after a stroke that
+    # doesn't finish a new word), so occurrences are identified by the
+    # term and where it ends in the output. The count is kept until the
+    # term is consumed, so a term that couldn't be briefed is let through
+    # again the next time it's seen.
+    def __init__(self, min_count: int = 1, capacity: int = 5000, recent: int = 256) -> None:
+        self.min_count = min_count
+        self.counter = SpaceSaving(capacity)
+        self._recent: deque = deque(maxlen=recent)
+        self._recent_set = set()
+
+    def seen(self, term: str, position: int) -> bool:
+        if self.min_count <= 1:
+            return True
+
+        occurrence: Hashable = (term, position)
+        if occurrence in self._recent_set:
+            return False
+
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_set.discard(self._recent[0])
+        self._recent.append(occurrence)
+        self._recent_set.add(occurrence)
+
+        return self.counter.add(term) >= self.min_count
+
+    def consume(self, term: str) -> None:
+        self.counter.discard(term)
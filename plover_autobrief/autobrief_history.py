@@ -0,0 +1,127 @@
+import json
+import os
+
+from typing import Callable, Iterator, Optional, Sequence, Tuple
+
+from plover import log
+
+from plover_autobrief.autobrief_outline import Outline
+from plover_autobrief.autobrief_store import Suggestion, SuggestionStore
+
+
+BLOCK_SIZE = 1 << 16
+
+
+def iter_lines_reversed(path: str) -> Iterator[bytes]:
+    # Reads the file backwards a block at a time, so the newest records
+    # are available without reading the whole history
+    with open(path, "rb") as fp:
+        fp.seek(0, os.SEEK_END)
+        position = fp.tell()
+        remainder = b""
+        while position > 0:
+            size = min(BLOCK_SIZE, position)
+            position -= size
+            fp.seek(position)
+            lines = (fp.read(size) + remainder).split(b"\n")
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+
+        if remainder:
+            yield remainder
+
+
+class SuggestionHistory:
+    # Append-only log of suggestion states; the last record for a
+    # translation wins.
+    def __init__(self, path: str, outline: Callable[[Sequence[str]], Outline]) -> None:
+        self.path = path
+        self.outline = outline
+        self.records = 0
+        self._fp = None
+        self._reader: Optional[Iterator[bytes]] = None
+        self.exhausted = False
+
+    def record(self, entry: Suggestion) -> None:
+        try:
+            if self._fp is None:
+                self._fp = open(self.path, "a", encoding="utf-8")
+
+            self._fp.write(json.dumps({
+                "translation": entry.translation,
+                "brief": entry.brief.strokes,
+                "added": entry.added
+            }) + "\n")
+            self._fp.flush()
+            self.records += 1
+        except OSError:
+            log.warning("Autobrief couldn't save suggestion history", exc_info=True)
+
+    def _read_one(self) -> Optional[Tuple[str, Outline, bool]]:
+        if self._reader is None:
+            if not os.path.exists(self.path):
+                self.exhausted = True
+                return None
+
+            self._reader = iter_lines_reversed(self.path)
+
+        for line in self._reader:
+            self.records += 1
+            try:
+                record = json.loads(line)
+                return (
+                    record["translation"],
+                    self.outline(record["brief"]),
+                    bool(record["added"])
+                )
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        self.exhausted = True
+        return None
+
+    def load(self, store: SuggestionStore, count: int) -> int:
+        # Moves up to count more restored entries, newest first, to the
+        # back of the store
+        loaded = 0
+        while loaded < count and not self.exhausted:
+            if store.max_size > 0 and len(store) >= store.max_size:
+                self.exhausted = True
+                break
+
+            record = self._read_one()
+            if record is None:
+                break
+
+            if store.append(*record) is not None:
+                loaded += 1
+
+        return loaded
+
+    def compact(self, store: SuggestionStore) -> None:
+        # Only safe once everything has been read back in
+        if not self.exhausted or self.records <= 2 * len(store):
+            return
+
+        self.close()
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as fp:
+                for entry in reversed(list(store)):
+                    fp.write(json.dumps({
+                        "translation": entry.translation,
+                        "brief": entry.brief.strokes,
+                        "added": entry.added
+                    }) + "\n")
+
+            os.replace(temp_path, self.path)
+            self.records = len(store)
+        except OSError:
+            log.warning("Autobrief couldn't compact suggestion history", exc_info=True)
+
+    def close(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
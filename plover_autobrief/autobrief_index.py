@@ -0,0 +1,200 @@
+import threading
+
+from typing import Container, Dict, Iterable, List, Optional, Set, Tuple
+
+from plover.engine import StenoEngine
+
+from plover_autobrief.autobrief_buffer import WORD_RX
+from plover_autobrief.autobrief_cache import dictionary_fingerprint
+from plover_autobrief.autobrief_outline import Outline, OutlineKey
+from plover_autobrief.autobrief_validator import StrokeValidator
+
+
+def phrase_tokens(text: str) -> List[str]:
+    return [word.strip() for word in WORD_RX.findall(text)]
+
+
+class PhraseTrie:
+    # Word-level trie over multi-word translations, keyed from the last word
+    # backwards so every phrase ending at a given word is found in one walk.
+    # The None key of a node holds the shortest outline for that phrase.
+    def __init__(self) -> None:
+        self.root: Dict = {}
+
+    def add(self, translation: str, length: int) -> None:
+        tokens = phrase_tokens(translation)
+        if len(tokens) < 2:
+            return
+
+        node = self.root
+        for token in reversed(tokens):
+            node = node.setdefault(token, {})
+
+        current = node.get(None)
+        if current is None or length < current:
+            node[None] = length
+
+    def shortest(self, text: str) -> Optional[int]:
+        node = self.root
+        for token in reversed(phrase_tokens(text)):
+            node = node.get(token)
+            if node is None:
+                return None
+
+        return node.get(None)
+
+
+def _keep_shortest(lengths: Dict[str, int], key: str, length: int) -> None:
+    current = lengths.get(key)
+    if current is None or length < current:
+        lengths[key] = length
+
+
+class Vocabulary:
+    # Single-word translations mapped to their shortest outline length. Most
+    # translations are already lowercase, so only those that change when
+    # case-folded get a second entry.
+    def __init__(self) -> None:
+        self._exact: Dict[str, int] = {}
+        self._folded: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def add(self, translation: str, length: int) -> None:
+        _keep_shortest(self._exact, translation, length)
+        folded = translation.casefold()
+        if folded != translation:
+            _keep_shortest(self._folded, folded, length)
+
+    def shortest(self, text: str, case_sensitive: bool = True) -> Optional[int]:
+        if case_sensitive:
+            # The lowercase form still counts, for words capitalized at the
+            # start of a sentence
+            lengths = (self._exact.get(text), self._exact.get(text.lower()))
+        else:
+            folded = text.casefold()
+            lengths = (self._exact.get(folded), self._folded.get(folded))
+
+        lengths = [length for length in lengths if length is not None]
+        return min(lengths) if lengths else None
+
+
+class OutlineIndex:
+    # Occupied outlines are kept as their packed keys, so a conflict check
+    # hashes a single int rather than a tuple of strings
+    def __init__(self, engine: StenoEngine, validator: StrokeValidator) -> None:
+        self.engine = engine
+        self.validator = validator
+        self._outlines: Optional[Set[OutlineKey]] = None
+        self.phrases: Optional[PhraseTrie] = None
+        self.vocabulary: Optional[Vocabulary] = None
+        self._fingerprint: Tuple = ()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._outlines is not None
+
+    def rebuild(self, wait: bool = False) -> None:
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+
+        if wait:
+            self._build(generation)
+            return
+
+        threading.Thread(
+            target=self._build,
+            args=(generation,),
+            name="autobrief-outline-index",
+            daemon=True
+        ).start()
+
+    def _build(self, generation: int) -> None:
+        fingerprint = dictionary_fingerprint(self.engine)
+        outlines = set()
+        phrases = PhraseTrie()
+        vocabulary = Vocabulary()
+        masks: Dict[str, Optional[int]] = {}
+        outline_key = self.validator.outline_key
+        for dic in self.engine.dictionaries.dicts:
+            if dic.enabled:
+                # Copied in one go so edits made meanwhile can't break the loop
+                for outline, translation in list(dic.items()):
+                    key = outline_key(outline, masks)
+                    if key is None:
+                        key = "/".join(outline)
+
+                    # Dictionaries come highest priority first, and like in
+                    # engine.lookup an outline there hides the same one
+                    # further down
+                    if key in outlines:
+                        continue
+
+                    outlines.add(key)
+                    if " " in translation:
+                        phrases.add(translation, len(outline))
+                    else:
+                        vocabulary.add(translation, len(outline))
+
+        with self._lock:
+            # A newer rebuild was requested while this one was running
+            if generation != self._generation:
+                return
+
+            self._outlines = outlines
+            self.phrases = phrases
+            self.vocabulary = vocabulary
+            self._fingerprint = fingerprint
+
+    def validate(self) -> None:
+        if self.ready and dictionary_fingerprint(self.engine) != self._fingerprint:
+            self._outlines = None
+            self.phrases = None
+            self.vocabulary = None
+            self.rebuild()
+
+    def add(self, outline: Outline, translation: str = "") -> None:
+        # Also called before a commit is saved, when the engine doesn't
+        # know the outline yet. If it gives another translation, the
+        # outline is hidden by a higher dictionary and doesn't count for
+        # this one.
+        if translation and self.engine.lookup(outline.strokes) not in (None, translation):
+            translation = ""
+
+        with self._lock:
+            if self._outlines is not None:
+                self._outlines.add(outline.key)
+                if translation and " " in translation:
+                    self.phrases.add(translation, len(outline))
+                elif translation:
+                    self.vocabulary.add(translation, len(outline))
+                self._fingerprint = dictionary_fingerprint(self.engine)
+
+    def discard(self, outline: Outline) -> None:
+        with self._lock:
+            if self._outlines is not None:
+                self._outlines.discard(outline.key)
+                self._fingerprint = dictionary_fingerprint(self.engine)
+
+    def is_occupied(self, outline: Outline) -> bool:
+        outlines = self._outlines
+        if outlines is None:
+            # Still building, ask the engine directly
+            return self.engine.lookup(outline.strokes) is not None
+
+        return outline.key in outlines
+
+    def first_free(
+        self,
+        candidates: Iterable[Outline],
+        reserved: Container[Outline] = ()
+    ) -> Optional[Outline]:
+        for outline in candidates:
+            if outline not in reserved and not self.is_occupied(outline):
+                return outline
+
+        return None
@@ -0,0 +1,131 @@
+import hashlib
+import importlib.util
+import marshal
+import os
+import sys
+
+from types import CodeType, ModuleType
+from typing import Callable, Optional, Tuple
+
+
+# Briefed once before a freshly loaded script is swapped in
+SAMPLE_TEXT = "example"
+
+
+class BriefGenError(Exception):
+    pass
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+def module_name(path: str) -> str:
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return f"autobrief_brief_gen_{digest[:12]}"
+
+
+def _cache_prefix(path: str) -> Tuple[str, str]:
+    directory = os.path.join(os.path.dirname(os.path.abspath(path)), "__pycache__")
+    name = os.path.splitext(os.path.basename(path))[0]
+    return directory, f"{name}.autobrief-"
+
+
+def compile_source(source: bytes, path: str) -> CodeType:
+    # Bytecode is cached under the hash of the source rather than its
+    # mtime, so an edit saved within the same second as the last one is
+    # never mistaken for it
+    digest = hashlib.sha1(importlib.util.MAGIC_NUMBER + source).hexdigest()
+    directory, prefix = _cache_prefix(path)
+    cache_name = f"{prefix}{digest[:16]}.pyc"
+    cache_path = os.path.join(directory, cache_name)
+    try:
+        with open(cache_path, "rb") as fp:
+            return marshal.load(fp)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    code = compile(source, path, "exec", dont_inherit=True)
+    if sys.dont_write_bytecode:
+        return code
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as fp:
+            marshal.dump(code, fp)
+        os.replace(temp_path, cache_path)
+
+        # Older versions of the same script
+        for entry in os.listdir(directory):
+            if entry.startswith(prefix) and entry.endswith(".pyc") and entry != cache_name:
+                os.remove(os.path.join(directory, entry))
+    except OSError:
+        pass
+
+    return code
+
+
+def load_module(path: str, source: bytes) -> ModuleType:
+    name = module_name(path)
+    code = compile_source(source, path)
+    module = ModuleType(name)
+    module.__file__ = path
+
+    # Registered while it runs, like an import, for anything that looks
+    # its own module up (dataclasses, pickle)
+    previous = sys.modules.get(name)
+    sys.modules[name] = module
+    try:
+        exec(code, module.__dict__)
+    except BaseException:
+        if previous is None:
+            del sys.modules[name]
+        else:
+            sys.modules[name] = previous
+        raise
+
+    return module
+
+
+def check_get_briefs(get_briefs: Callable) -> None:
+    try:
+        briefs = get_briefs(SAMPLE_TEXT)
+        first = next(iter(briefs), None) if briefs is not None else None
+    except Exception as e:
+        raise BriefGenError(f"get_briefs failed on {SAMPLE_TEXT!r}") from e
+
+    if first is not None and (
+        isinstance(first, str)
+        or not all(isinstance(stroke, str) for stroke in first)
+    ):
+        raise BriefGenError("get_briefs should give briefs as tuples of strokes")
+
+
+def load_get_briefs(
+    path: str,
+    validate: bool = True,
+    source: Optional[bytes] = None
+) -> Callable:
+    try:
+        if source is None:
+            with open(path, "rb") as fp:
+                source = fp.read()
+
+        module = load_module(path, source)
+    except Exception as e:
+        raise BriefGenError(f"{path} failed to load") from e
+
+    get_briefs = getattr(module, "get_briefs", None)
+    if not callable(get_briefs):
+        raise BriefGenError(f"{path} doesn't define get_briefs")
+
+    if validate:
+        check_get_briefs(get_briefs)
+
+    return get_briefs
@@ -1,7 +1,26 @@
+from typing import List
+
 from plover.translation import Translator
 from plover.steno import Stroke
 
 
+def parse_rows(argument: str, max_row: int) -> List[int]:
+    # "3", "1-5" and "1,3,5" style row numbers; ranges stop at max_row so a
+    # stray "1-99999999" can't expand into a huge list
+    rows = []
+    for part in argument.split(","):
+        start, _, end = part.strip().partition("-")
+        if not start.isnumeric():
+            continue
+
+        if not end:
+            rows.append(int(start))
+        elif end.isnumeric():
+            rows.extend(range(int(start), min(int(end), max_row) + 1))
+
+    return rows
+
+
 def prev_page(translator: Translator, stroke: Stroke, argument: str):
     translator.autobrief_state = "prev_page"
 
@@ -15,6 +34,18 @@ def commit_brief(translator: Translator, stroke: Stroke, argument: str):
     translator.autobrief_arg = argument
 
 
+def commit_page(translator: Translator, stroke: Stroke, argument: str):
+    translator.autobrief_state = "commit_page"
+
+
+def commit_all(translator: Translator, stroke: Stroke, argument: str):
+    translator.autobrief_state = "commit_all"
+
+
 def define_brief(translator: Translator, stroke: Stroke, argument: str):
     translator.autobrief_state = "define_brief"
     translator.autobrief_arg = argument
+
+
+def dump_stats(translator: Translator, stroke: Stroke, argument: str):
+    translator.autobrief_state = "dump_stats"
@@ -0,0 +1,129 @@
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QObject, Qt, QTimer
+
+import time
+
+from typing import Any, Callable, Optional, Set
+
+from plover_autobrief.autobrief_store import Suggestion, SuggestionStore
+
+
+COLUMN_COUNT = 4
+
+
+class SuggestionModel(QAbstractTableModel):
+    def __init__(self, store: SuggestionStore, page_len: int, parent=None) -> None:
+        super().__init__(parent)
+        self._store = store
+        self._page_len = page_len
+        self._page = 0
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._page_len
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else COLUMN_COUNT
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+
+        position = self._page * self._page_len + index.row()
+        if position >= len(self._store):
+            return ""
+
+        entry = self._store[position]
+        column = index.column()
+        if column == 0:
+            return str(index.row() + 1)
+        elif column == 1:
+            return entry.translation
+        elif column == 2:
+            return str(entry.brief)
+
+        return "Added" * entry.added
+
+    def set_page(self, page: int) -> None:
+        self._page = page
+
+    def set_page_len(self, page_len: int) -> None:
+        if page_len != self._page_len:
+            self.beginResetModel()
+            self._page_len = page_len
+            self.endResetModel()
+
+    def rows_changed(self, first: int = 0, last: Optional[int] = None) -> None:
+        if last is None:
+            last = self._page_len - 1
+
+        if first <= last:
+            self.dataChanged.emit(
+                self.index(first, 0),
+                self.index(last, COLUMN_COUNT - 1)
+            )
+
+    def entry_changed(self, entry: Suggestion) -> None:
+        top_index = self._page * self._page_len
+        for row, displayed in enumerate(self._store.page(top_index, self._page_len)):
+            if displayed is entry:
+                self.rows_changed(row, row)
+                return
+
+
+class RefreshScheduler(QObject):
+    def __init__(
+        self,
+        refresh: Callable[[bool, Set[Suggestion]], None],
+        max_rate: int,
+        parent=None
+    ) -> None:
+        super().__init__(parent)
+        self._refresh = refresh
+        self._interval = 1.0 / max(max_rate, 1)
+        self._full = False
+        self._entries: Set[Suggestion] = set()
+        self._last = 0.0
+        self.paused = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+    def set_max_rate(self, max_rate: int) -> None:
+        self._interval = 1.0 / max(max_rate, 1)
+
+    def pending(self) -> bool:
+        return self._full or bool(self._entries)
+
+    def schedule(self, entry: Optional[Suggestion] = None) -> None:
+        # No entry means the whole page needs repainting
+        if entry is None:
+            self._full = True
+        else:
+            self._entries.add(entry)
+
+        self._start()
+
+    def _start(self) -> None:
+        if self.paused or self._timer.isActive() or not self.pending():
+            return
+
+        wait = max(0.0, self._last + self._interval - time.monotonic())
+        self._timer.start(int(wait * 1000))
+
+    def flush(self) -> None:
+        if self.paused or not self.pending():
+            return
+
+        full, entries = self._full, self._entries
+        self._full = False
+        self._entries = set()
+        self._last = time.monotonic()
+        self._refresh(full, entries)
+
+    def pause(self) -> None:
+        self.paused = True
+        self._timer.stop()
+
+    def resume(self) -> None:
+        self.paused = False
+        self._start()
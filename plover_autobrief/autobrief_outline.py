@@ -0,0 +1,70 @@
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+
+StenoOutline = Tuple[str, ...]
+OutlineKey = Union[int, str]
+
+
+def pack_masks(masks: Iterable[Optional[int]], key_count: int) -> Optional[int]:
+    # Each stroke takes key_count + 1 bits: its keys, plus a marker bit so
+    # the number of strokes never depends on which keys are down. None if
+    # any stroke doesn't fit the layout.
+    marker = 1 << key_count
+    width = key_count + 1
+    packed = 0
+    shift = 0
+    for mask in masks:
+        if mask is None:
+            return None
+
+        packed |= (mask | marker) << shift
+        shift += width
+
+    return packed
+
+
+class Outline:
+    # A brief as a single integer for hashing and comparison, with its
+    # RTFCRE text kept alongside for display and for Plover's dictionaries.
+    # Outlines that don't fit the steno system are keyed by their text, so
+    # they never compare equal to one that does.
+    __slots__ = ("key", "rtfcre")
+
+    def __init__(self, key: OutlineKey, rtfcre: str) -> None:
+        self.key = key
+        self.rtfcre = rtfcre
+
+    @property
+    def valid(self) -> bool:
+        return isinstance(self.key, int)
+
+    @property
+    def strokes(self) -> StenoOutline:
+        return tuple(self.rtfcre.split("/")) if self.rtfcre else ()
+
+    def __len__(self) -> int:
+        return self.rtfcre.count("/") + 1 if self.rtfcre else 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.strokes)
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Outline):
+            return NotImplemented
+
+        return self.key == other.key
+
+    def __str__(self) -> str:
+        return self.rtfcre
+
+    def __repr__(self) -> str:
+        return f"Outline({self.rtfcre!r})"
+
+    def __reduce__(self):
+        return Outline, (self.key, self.rtfcre)
+
+
+EMPTY_OUTLINE = Outline("", "")
@@ -0,0 +1,143 @@
+import itertools
+import multiprocessing
+import queue
+
+from typing import List, Optional, Tuple
+
+from plover_autobrief.autobrief_loader import BriefGenError, load_get_briefs
+
+
+STARTUP_TIMEOUT = 10.0
+
+
+def _worker_main(path: str, conn) -> None:
+    try:
+        get_briefs = load_get_briefs(path, validate=False)
+    except BriefGenError:
+        get_briefs = None
+
+    conn.send(get_briefs is not None)
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+
+        if request is None:
+            return
+
+        # None tells the pool the script failed, rather than had no briefs
+        text, limit = request
+        briefs = None
+        if get_briefs is not None:
+            try:
+                briefs = get_briefs(text) or ()
+                if limit:
+                    briefs = itertools.islice(briefs, limit)
+
+                briefs = [tuple(brief) for brief in briefs]
+            except Exception:
+                briefs = None
+
+        conn.send(briefs)
+
+
+class _Worker:
+    def __init__(self, ctx, path: str) -> None:
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(path, child_conn),
+            name="autobrief-brief-gen",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        # Whether the script loaded, once the worker has said so
+        self.loaded: Optional[bool] = None
+
+    def wait_ready(self) -> bool:
+        if self.loaded is None:
+            if not self.conn.poll(STARTUP_TIMEOUT):
+                return False
+
+            self.loaded = bool(self.conn.recv())
+
+        return self.loaded
+
+    def kill(self) -> None:
+        self.process.terminate()
+        self.conn.close()
+
+
+class BriefGenPool:
+    def __init__(self, path: str, size: int = 2, timeout: float = 0.2) -> None:
+        self.path = path
+        self.timeout = timeout
+        self.timeouts = 0
+        self.crashes = 0
+        self.errors = 0
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: queue.Queue = queue.Queue()
+        self._closed = False
+
+        for _ in range(size):
+            self._idle.put(_Worker(self._ctx, path))
+
+    def _recycle(self, worker: _Worker) -> None:
+        worker.kill()
+        if not self._closed:
+            self._idle.put(_Worker(self._ctx, self.path))
+
+    def check(self) -> bool:
+        # Waits for a worker to load the script; False if it couldn't
+        worker = self._idle.get()
+        try:
+            return worker.wait_ready()
+        finally:
+            self._idle.put(worker)
+
+    def call(self, text: str, limit: int = 0) -> Optional[List[Tuple[str, ...]]]:
+        # Returns None if the script failed, the call ran out of time or
+        # the worker died, so callers can tell a failure apart from "no
+        # briefs". Only the first limit briefs are pulled from the script
+        # if limit is set.
+        if self._closed:
+            return None
+
+        worker = self._idle.get()
+        try:
+            if worker.wait_ready():
+                worker.conn.send((text, limit))
+                if worker.conn.poll(self.timeout):
+                    result = worker.conn.recv()
+                    if self._closed:
+                        worker.kill()
+                    else:
+                        self._idle.put(worker)
+
+                    if result is None:
+                        self.errors += 1
+                    return result
+
+            if worker.loaded is False:
+                self.errors += 1
+            else:
+                self.timeouts += 1
+
+        except (EOFError, OSError):
+            self.crashes += 1
+
+        self._recycle(worker)
+        return None
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+            worker.kill()
@@ -0,0 +1,96 @@
+import time
+
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+from plover import log
+
+from plover_autobrief.autobrief_loader import file_stamp
+from plover_autobrief.autobrief_rules import BriefRules
+from plover_autobrief.autobrief_store import SuggestionStore
+
+
+# Longest stretch of prep work done before checking for strokes again
+SLICE_SECONDS = 0.02
+
+# Most terms from the list that get a brief set aside at once
+MAX_PREPARED = 1000
+
+
+def read_prep_list(path: str) -> List[str]:
+    # One word or phrase per line; blank lines and "#" comments are skipped
+    terms = {}
+    with open(path, encoding="utf-8", errors="replace") as fp:
+        for line in fp:
+            term = " ".join(line.split())
+            if term and not term.startswith("#"):
+                terms[term] = None
+
+    return list(terms)
+
+
+class PrepList:
+    # Briefs the terms of a prep word list on the analysis worker while the
+    # engine is idle, into rules.prepared, so they're ready by the time the
+    # term is first written. Everything but load runs on the worker.
+    def __init__(self, rules: BriefRules) -> None:
+        self.rules = rules
+        self.path = ""
+        self.total = 0
+        self.done = 0
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._reload = False
+        self._pending: deque = deque()
+
+    def load(self, path: str, force: bool = False) -> bool:
+        # Only read once the worker gets to it; False if nothing changed
+        stamp = file_stamp(path) if path else None
+        if not force and path == self.path and stamp == self._stamp:
+            return False
+
+        self.path = path
+        self._stamp = stamp
+        self._reload = True
+        return True
+
+    def _read(self) -> None:
+        self._reload = False
+        self.rules.prepared = SuggestionStore(0)
+        terms = []
+        if self.path:
+            try:
+                terms = read_prep_list(self.path)
+            except OSError:
+                log.warning(f"Autobrief couldn't read {self.path}", exc_info=True)
+
+        self._pending = deque(terms)
+        self.total = len(terms)
+        self.done = 0
+
+    def step(self, should_yield: Callable[[], bool]) -> Optional[bool]:
+        # Returns whether there's more to do, or None to wait for the
+        # outline index, since looking briefs up without it goes to the
+        # engine's dictionaries from this thread
+        if self._reload:
+            self._read()
+
+        if self._pending and not self.rules.outline_index.ready:
+            return None
+
+        clock = time.perf_counter
+        deadline = clock() + SLICE_SECONDS
+        rules = self.rules
+        while self._pending and len(rules.prepared) < MAX_PREPARED:
+            if should_yield() or clock() >= deadline:
+                return True
+
+            term = self._pending.popleft()
+            self.done += 1
+            if term in rules.prepared or not rules.is_briefable(term, []):
+                continue
+
+            found, brief = rules.brief_text(term)
+            if found and brief:
+                rules.prepared.append(term, brief, False)
+
+        return self._reload
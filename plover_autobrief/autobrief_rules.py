@@ -0,0 +1,305 @@
+import itertools
+import threading
+
+from collections import Counter
+from contextlib import closing
+from typing import Container, Iterator, List, Optional, Tuple
+
+from plover.translation import Translation
+
+from plover_autobrief.autobrief_buffer import last_words as buffer_last_words
+from plover_autobrief.autobrief_cache import ReverseLookupCache
+from plover_autobrief.autobrief_config import AutobriefConfig
+from plover_autobrief.autobrief_frequency import OccurrenceGate
+from plover_autobrief.autobrief_index import OutlineIndex
+from plover_autobrief.autobrief_outline import EMPTY_OUTLINE, Outline
+from plover_autobrief.autobrief_store import SuggestionStore
+from plover_autobrief.autobrief_validator import StrokeValidator
+
+
+class ReservedBriefs:
+    # Every brief already given to a term, wherever it's kept
+    def __init__(self, *collections: Container[Outline]) -> None:
+        self.collections = collections
+
+    def __contains__(self, brief: object) -> bool:
+        return any(brief in collection for collection in self.collections)
+
+
+class BriefRules:
+    # Decides what gets suggested and which brief it gets. Kept apart from
+    # the tool window so the same rules can be run without Qt.
+    def __init__(
+        self,
+        config: AutobriefConfig,
+        suggestions: SuggestionStore,
+        outline_index: OutlineIndex,
+        reverse_cache: ReverseLookupCache,
+        validator: StrokeValidator,
+        gate: OccurrenceGate
+    ) -> None:
+        self.config = config
+        self.suggestions = suggestions
+        self.outline_index = outline_index
+        self.reverse_cache = reverse_cache
+        self.validator = validator
+        self.gate = gate
+        # Briefed ahead of time from a prep word list
+        self.prepared = SuggestionStore(0)
+        # Handed out by find_briefs but not yet in the suggestion store,
+        # which is only updated on the GUI thread
+        self.pending: Counter = Counter()
+        self._pending_lock = threading.Lock()
+
+    def is_valid_outline(self, outline: str) -> bool:
+        return self.validator.is_valid_outline(outline)
+
+    def passes_filters(self, text: str, recent: List[Translation]) -> bool:
+        if (
+            text in self.suggestions
+            or len(text) < self.config.min_length
+            or any(c in self.config.exclude_chars for c in text)
+            or self.is_valid_outline(text)
+        ):
+            return False
+
+        # Don't suggest briefs for words that were from a non-explicit dict entry
+        for tl_obj in recent:
+            if (
+                tl_obj.english
+                and text in tl_obj.english
+                and len(tl_obj.rtfcre) < self.config.min_strokes
+            ):
+                return False
+
+        return True
+
+    def is_briefable(self, text: str, recent: List[Translation]) -> bool:
+        if not self.passes_filters(text, recent):
+            return False
+
+        splitted = text.split()
+        if len(splitted) > 1:
+            if self.config.brief_cap_phrases:
+                if not splitted[0][0].isupper():
+                    return False
+                if not splitted[-1][0].isupper():
+                    return False
+
+                cap_count = len([
+                    w for w in splitted
+                    if len(w) < 5 or w[0].isupper()
+                ])
+
+                if cap_count < len(splitted):
+                    return False
+                
+            else:
+                return False
+
+        shortest = self.shortest_outline(text, len(splitted) == 1)
+        if shortest is None:
+            return self.config.brief_unknown_words
+
+        return shortest >= self.config.min_strokes
+
+    def shortest_outline(self, text: str, single_word: bool) -> Optional[int]:
+        vocabulary = self.outline_index.vocabulary
+        phrases = self.outline_index.phrases
+        if single_word and vocabulary is not None:
+            return vocabulary.shortest(text, self.config.brief_case_sensitive)
+        elif not single_word and phrases is not None:
+            return phrases.shortest(text)
+
+        # Index still building, fall back to reverse lookups
+        if single_word:
+            # Don't suggest briefs for all capitalized words
+            lookup_texts = {text, text.lower()}
+            if not self.config.brief_case_sensitive:
+                lookup_texts.update((text.capitalize(), text.upper()))
+        else:
+            lookup_texts = {text}
+
+        lengths = [
+            len(outline)
+            for lookup_text in lookup_texts
+            for outline in self.reverse_cache.lookup(lookup_text)
+        ]
+        return min(lengths) if lengths else None
+
+    def briefable_phrases(
+        self,
+        last_words: List[str],
+        recent: List[Translation]
+    ) -> Iterator[str]:
+        # Phrases of three or more words ending with the last word, longest
+        # first. Checked in a single backwards walk over the phrase trie.
+        if not self.config.brief_cap_phrases:
+            return
+
+        lw_length = len(last_words)
+        phrases = self.outline_index.phrases
+        if phrases is None:
+            # Index still building, check each window the slow way
+            for index in range(0, lw_length - 2):
+                text_to_brief = "".join(last_words[index:lw_length]).strip()
+                if self.is_briefable(text_to_brief, recent):
+                    yield text_to_brief
+            return
+
+        tokens = [word.strip() for word in last_words]
+        if not tokens or not tokens[-1][:1].isupper():
+            return
+
+        exclude_chars = self.config.exclude_chars
+        node = phrases.root
+        lengths = []
+        for length in range(1, lw_length + 1):
+            token = tokens[-length]
+
+            # Any longer window would contain this word too
+            if (
+                not token
+                or any(c in exclude_chars for c in token)
+                or not (len(token) < 5 or token[0].isupper())
+            ):
+                break
+
+            node = node.get(token) if node is not None else None
+            if length < 3 or not token[0].isupper():
+                continue
+
+            shortest = node.get(None) if node is not None else None
+            if shortest is None:
+                if self.config.brief_unknown_words:
+                    lengths.append(length)
+            elif shortest >= self.config.min_strokes:
+                lengths.append(length)
+
+        for length in reversed(lengths):
+            text_to_brief = "".join(last_words[-length:]).strip()
+            if self.passes_filters(text_to_brief, recent):
+                yield text_to_brief
+
+    @property
+    def reserved(self) -> ReservedBriefs:
+        # Prepared briefs are held for their terms even before they're
+        # written
+        return ReservedBriefs(self.suggestions.briefs, self.prepared.briefs, self.pending)
+
+    def reserve(self, brief: Outline) -> None:
+        if brief:
+            with self._pending_lock:
+                self.pending[brief] += 1
+
+    def release(self, brief: Outline) -> None:
+        # Once the brief has been added to the store, or dropped
+        if not brief:
+            return
+
+        with self._pending_lock:
+            if self.pending[brief] > 1:
+                self.pending[brief] -= 1
+            else:
+                del self.pending[brief]
+
+    def is_free(self, brief: Outline) -> bool:
+        if brief in self.suggestions.briefs:
+            return False
+        
+        if not self.config.override:
+            return not self.outline_index.is_occupied(brief)
+
+        return True
+
+    def is_valid_brief(self, brief: Outline) -> bool:
+        if not brief.valid or brief in self.reserved:
+            return False
+
+        return self.config.override or not self.outline_index.is_occupied(brief)
+
+    def brief_text(self, text: str) -> Tuple[bool, Outline]:
+        prepared = self.prepared.get(text)
+        if prepared is not None and self.is_free(prepared.brief):
+            return True, prepared.brief
+
+        with closing(self.config.iter_briefs(text)) as briefs:
+            if self.config.brief_budget:
+                briefs = itertools.islice(briefs, self.config.brief_budget)
+
+            strokable = (
+                outline
+                for outline in map(self.validator.outline, briefs)
+                if outline.valid
+            )
+
+            reserved = self.reserved
+            if self.config.override:
+                brief = next((b for b in strokable if b not in reserved), None)
+            else:
+                brief = self.outline_index.first_free(strokable, reserved)
+
+        if brief is not None:
+            return True, brief
+        elif self.config.no_briefer():
+            return True, EMPTY_OUTLINE
+
+        return False, EMPTY_OUTLINE
+
+    def last_words(self, text: str, count: int) -> List[str]:
+        return buffer_last_words(text, count)
+
+    def find_briefs(
+        self,
+        snapshot: Tuple[str, int, List[Translation]],
+        depth: int
+    ) -> List[Tuple[str, Outline]]:
+        # Depth is the number of word endings that have not been analysed
+        # yet, because their jobs were superseded by later strokes.
+        text, position, recent = snapshot
+        search_depth = self.config.search_depth
+        self.reverse_cache.validate()
+        self.outline_index.validate()
+        words: List[str] = self.last_words(text, search_depth + depth - 1)
+        all_words = words[:-1]
+        brief_buffer = []
+
+        # Briefs are reserved as they're found, so the next term in this job
+        # can't take them. If the job fails they're handed back, and counts
+        # are only consumed once the whole job is through.
+        try:
+            for offset in reversed(range(min(depth, len(all_words)))):
+                last_words = all_words[:len(all_words) - offset][-search_depth:]
+                if not last_words:
+                    continue
+
+                # Where the window ends in the output, to tell occurrences apart
+                end = position - sum(len(word) for word in words[len(words) - 1 - offset:])
+
+                # Last word
+                last_word = last_words[-1].strip()
+                if self.is_briefable(last_word, recent) and self.gate.seen(last_word, end):
+                    found, brief = self.brief_text(last_word)
+                    if found:
+                        self.reserve(brief)
+                        brief_buffer.append((last_word, brief))
+
+                # Longest valid phrase that ends with last word
+                for text_to_brief in self.briefable_phrases(last_words, recent):
+                    if not self.gate.seen(text_to_brief, end):
+                        break
+
+                    found, brief = self.brief_text(text_to_brief)
+                    if found:
+                        self.reserve(brief)
+                        brief_buffer.append((text_to_brief, brief))
+                        break
+        except BaseException:
+            for _, brief in brief_buffer:
+                self.release(brief)
+            raise
+
+        for translation, _ in brief_buffer:
+            self.gate.consume(translation)
+
+        return brief_buffer
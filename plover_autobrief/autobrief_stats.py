@@ -0,0 +1,209 @@
+import math
+import threading
+import time
+
+from collections import deque
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+WINDOW = 1024
+
+# Display order, roughly the order a stroke goes through them
+STAGES = (
+    "on_stroke",
+    "find_briefs",
+    "last_words",
+    "is_briefable",
+    "brief_text",
+    "get_briefs",
+    "first_free",
+    "on_suggestions_ready",
+    "update_table"
+)
+
+
+class StageHistogram:
+    # Durations of the most recent calls to one stage, plus running totals
+    def __init__(self, window: int = WINDOW) -> None:
+        self.samples: deque = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, elapsed: float) -> None:
+        self.samples.append(elapsed)
+        self.count += 1
+        self.total += elapsed
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": self.count, "mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+
+        def percentile(fraction: float) -> float:
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "p50": percentile(0.5),
+            "p99": percentile(0.99),
+            "max": ordered[-1]
+        }
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        # Power of two buckets in microseconds, over the recent calls only
+        counts: Dict[int, int] = {}
+        for elapsed in list(self.samples):
+            bucket = max(0, math.ceil(math.log2(max(elapsed * 1e6, 1.0))))
+            counts[bucket] = counts.get(bucket, 0) + 1
+
+        return [(2.0 ** bucket, counts[bucket]) for bucket in sorted(counts)]
+
+
+def _timed_iter(iterator: Iterator, record: Callable[[float], None]) -> Iterator:
+    # Only the time spent inside the iterator counts, not the consumer's
+    elapsed = 0.0
+    clock = time.perf_counter
+    try:
+        while True:
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                elapsed += clock() - start
+                return
+
+            elapsed += clock() - start
+            yield item
+    finally:
+        record(elapsed)
+
+
+def timed_slot(stage: str) -> Callable:
+    # For methods connected to Qt signals and Plover hooks, which hold on
+    # to the bound method they were connected with, so a wrapper put on
+    # the instance later is never called. These time themselves through
+    # the instance's stats instead, only while collection is on.
+    def decorator(method: Callable) -> Callable:
+        clock = time.perf_counter
+
+        @wraps(method)
+        def wrapper(self, *args):
+            stats = self.stats
+            if not stats.enabled:
+                return method(self, *args)
+
+            start = clock()
+            try:
+                return method(self, *args)
+            finally:
+                stats.record(stage, clock() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class PipelineStats:
+    # Timing is added by wrapping methods on the instances that run each
+    # stage, and removed again by deleting the wrappers, so nothing is
+    # left on the hot path while collection is off. Slots are timed with
+    # timed_slot instead.
+    def __init__(self, window: int = WINDOW) -> None:
+        self.window = window
+        self.stages: Dict[str, StageHistogram] = {}
+        self._wrapped: List[Tuple[Any, str]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._wrapped)
+
+    def record(self, stage: str, elapsed: float) -> None:
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = StageHistogram(self.window)
+
+            histogram.record(elapsed)
+
+    def timed(self, function: Callable, stage: str, iterates: bool = False) -> Callable:
+        clock = time.perf_counter
+
+        def record(elapsed: float) -> None:
+            self.record(stage, elapsed)
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            result = function(*args, **kwargs)
+            elapsed = clock() - start
+            if iterates and result is not None and iter(result) is result:
+                # Generators do their work as they're consumed
+                return _timed_iter(result, lambda rest: record(elapsed + rest))
+
+            record(elapsed)
+            return result
+
+        return wrapper
+
+    def instrument(self, obj: Any, attr: str, stage: str, iterates: bool = False) -> None:
+        setattr(obj, attr, self.timed(getattr(obj, attr), stage, iterates))
+        self._wrapped.append((obj, attr))
+
+    def uninstrument(self) -> None:
+        for obj, attr in reversed(self._wrapped):
+            try:
+                delattr(obj, attr)
+            except AttributeError:
+                pass
+
+        self._wrapped = []
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages = {}
+
+    def report(self) -> str:
+        with self._lock:
+            stages = dict(self.stages)
+
+        names = [name for name in STAGES if name in stages]
+        names += sorted(name for name in stages if name not in STAGES)
+        if not names:
+            return "No timings recorded yet."
+
+        lines = [
+            f"{'stage':<22}{'calls':>8}{'mean':>10}{'p50':>10}{'p99':>10}{'max':>10}  (us)"
+        ]
+        for name in names:
+            summary = stages[name].summary()
+            lines.append(
+                f"{name:<22}{summary['count']:>8}"
+                + "".join(
+                    f"{summary[key] * 1e6:>10.1f}"
+                    for key in ("mean", "p50", "p99", "max")
+                )
+            )
+
+        lines.append("")
+        lines.append(f"Last {self.window} calls of each stage, by duration:")
+        for name in names:
+            buckets = stages[name].buckets()
+            total = sum(count for _, count in buckets) or 1
+            lines.append(name)
+            for upper, count in buckets:
+                bar = "#" * max(1, round(40 * count / total))
+                lines.append(f"  <= {upper:>9.0f}us {count:>6} {bar}")
+
+        return "\n".join(lines)
+
+    def dump(self, path: str, extra: Optional[Dict[str, Any]] = None) -> None:
+        with open(path, "a", encoding="utf-8") as fp:
+            fp.write(time.strftime("=== %Y-%m-%d %H:%M:%S ===\n"))
+            fp.write(self.report() + "\n")
+            for name, value in (extra or {}).items():
+                fp.write(f"{name}: {value}\n")
+
+            fp.write("\n")
@@ -0,0 +1,89 @@
+from collections import Counter, deque
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from plover_autobrief.autobrief_outline import Outline
+
+
+class Suggestion:
+    __slots__ = ("translation", "brief", "added")
+
+    def __init__(self, translation: str, brief: Outline, added: bool) -> None:
+        self.translation = translation
+        self.brief = brief
+        self.added = added
+
+
+class SuggestionStore:
+    def __init__(self, max_size: int = 1000) -> None:
+        self.max_size = max_size
+        self._entries: deque = deque()
+        self._keys: Dict[str, Suggestion] = {}
+        self._briefs: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Suggestion]:
+        return iter(self._entries)
+
+    def __getitem__(self, index: int) -> Suggestion:
+        return self._entries[index]
+
+    def __contains__(self, translation: str) -> bool:
+        return translation in self._keys
+
+    @property
+    def briefs(self) -> Counter:
+        # Supports "brief in store.briefs" without copying
+        return self._briefs
+
+    def get(self, translation: str) -> Optional[Suggestion]:
+        return self._keys.get(translation)
+
+    def page(self, start: int, count: int) -> List[Suggestion]:
+        return list(islice(self._entries, start, start + count))
+
+    def prepend(self, translation: str, brief: Outline, added: bool) -> Suggestion:
+        entry = Suggestion(translation, brief, added)
+        self._entries.appendleft(entry)
+        self._keys[translation] = entry
+        self._briefs[brief] += 1
+        self.trim()
+        return entry
+
+    def append(self, translation: str, brief: Outline, added: bool) -> Optional[Suggestion]:
+        # Older entries go to the back, and never replace a newer one
+        if translation in self._keys:
+            return None
+
+        entry = Suggestion(translation, brief, added)
+        self._entries.append(entry)
+        self._keys[translation] = entry
+        self._briefs[brief] += 1
+        self.trim()
+        return entry
+
+    def set_brief(self, entry: Suggestion, brief: Outline) -> bool:
+        # An entry that's been trimmed (or replaced) has already given up its
+        # brief, so counting a new one for it would never be released
+        if self._keys.get(entry.translation) is not entry:
+            return False
+
+        self._release_brief(entry.brief)
+        entry.brief = brief
+        self._briefs[brief] += 1
+        return True
+
+    def _release_brief(self, brief: Outline) -> None:
+        self._briefs[brief] -= 1
+        if self._briefs[brief] <= 0:
+            del self._briefs[brief]
+
+    def trim(self) -> None:
+        while self.max_size > 0 and len(self._entries) > self.max_size:
+            entry = self._entries.pop()
+            if self._keys.get(entry.translation) is entry:
+                del self._keys[entry.translation]
+
+            self._release_brief(entry.brief)
@@ -1,18 +1,38 @@
-from PyQt5.QtWidgets import QTableWidgetItem
+from PyQt5.QtCore import QCoreApplication, QEvent, QTimer, pyqtSignal
 
-from typing import Tuple, List
+import os
 
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, List
+
+from plover import log
 from plover.engine import StenoEngine
-from plover.formatting import RetroFormatter
-from plover.gui_qt.add_translation_dialog import AddTranslationDialog
-from plover.steno import Stroke as SystemStroke
+from plover.oslayer.config import CONFIG_DIR
 from plover.translation import Translation
 
+from plover_autobrief.autobrief_buffer import WordBuffer
+from plover_autobrief.autobrief_cache import ReverseLookupCache
+from plover_autobrief.autobrief_commits import CommitQueue
+from plover_autobrief.autobrief_frequency import OccurrenceGate
+from plover_autobrief.autobrief_history import SuggestionHistory
+from plover_autobrief.autobrief_index import OutlineIndex
+from plover_autobrief.autobrief_macros import parse_rows
+from plover_autobrief.autobrief_model import RefreshScheduler, SuggestionModel
+from plover_autobrief.autobrief_outline import Outline
+from plover_autobrief.autobrief_prep import PrepList
+from plover_autobrief.autobrief_rules import BriefRules
+from plover_autobrief.autobrief_stats import timed_slot
+from plover_autobrief.autobrief_store import Suggestion, SuggestionStore
 from plover_autobrief.autobrief_ui import AutobriefUI
+from plover_autobrief.autobrief_validator import StrokeValidator
+from plover_autobrief.autobrief_worker import AnalysisWorker
 
 
 StenoOutline = Tuple[str, ...]
 
+HISTORY_FILE = "autobrief_history.jsonl"
+HISTORY_SLICE = 200
+INDEX_BUILD_DELAY_MS = 250
+
 
 def common_prefix(str_x: str, str_y: str) -> str:
     x_len = len(str_x)
@@ -26,114 +46,246 @@ def common_prefix(str_x: str, str_y: str) -> str:
 
 
 class AutobriefSuggestions(AutobriefUI):
+    suggestions_ready = pyqtSignal(list)
+
     def __init__(self, engine: StenoEngine) -> None:
         super().__init__(engine)
 
-        self._suggestions: List[Tuple[str, StenoOutline, bool]] = []
-        self._suggestion_keys = set()
-        self._suggestion_briefs = set()
+        self._suggestions = SuggestionStore(self.config.max_suggestions)
+        self._model = SuggestionModel(self._suggestions, self.config.page_len, self)
+        self.suggestions_table.setModel(self._model)
+        self._refresh = RefreshScheduler(
+            self.refresh_table,
+            self.config.max_refresh_rate,
+            self
+        )
         self._page = 0
+        self._reverse_cache = ReverseLookupCache(engine)
+        self._validator = StrokeValidator()
+        self._outline_index = OutlineIndex(engine, self._validator)
+        # Started once the window has been painted: the build thread holds
+        # the GIL for most of its run, which would hold up the first paint.
+        # Lookups go to the engine until it's ready.
+        QTimer.singleShot(INDEX_BUILD_DELAY_MS, self._outline_index.rebuild)
+        self._buffer = WordBuffer()
+        self._gate = OccurrenceGate(self.config.min_occurrences)
+        self._commits = CommitQueue(engine, self.on_commits_flushed, self)
+        self._rules = BriefRules(
+            self.config,
+            self._suggestions,
+            self._outline_index,
+            self._reverse_cache,
+            self._validator,
+            self._gate
+        )
+        self._prep = PrepList(self._rules)
+        self.update_stats()
+
+        # The first page of the history is restored right away and the rest
+        # a slice at a time while the GUI is idle
+        self._history = SuggestionHistory(
+            os.path.join(CONFIG_DIR, HISTORY_FILE),
+            self._validator.outline
+        )
+        self._history_timer = QTimer(self)
+        self._history_timer.timeout.connect(self.load_history_slice)
+        if self.config.save_history:
+            self._history.load(self._suggestions, self.config.page_len)
+            self._history_timer.start(0)
+            self.update_table()
 
+        # Results are posted back through a queued signal so the table is
+        # only ever touched from the GUI thread.
+        self.suggestions_ready.connect(self.on_suggestions_ready)
+        self._worker = AnalysisWorker(self.find_briefs, self.suggestions_ready.emit)
+        self._worker.start()
+        self.update_prep_list()
+        self.finished.connect(self._worker.stop)
+        self.finished.connect(self._commits.flush)
+        self.finished.connect(self.close_history)
+        QCoreApplication.instance().aboutToQuit.connect(self._commits.flush)
+
+        engine.signal_connect("send_string", self._buffer.send_string)
+        engine.signal_connect("send_backspaces", self._buffer.send_backspaces)
+        engine.signal_connect("send_key_combination", self._buffer.reset)
         engine.signal_connect("stroked", self.on_stroke)
+        engine.signal_connect("dictionaries_loaded", self.on_dictionaries_loaded)
+        engine.signal_connect("quit", self._commits.flush)
+
+    def on_dictionaries_loaded(self, *args) -> None:
+        self._reverse_cache.clear()
+        self._outline_index.rebuild()
+
+    def on_config_changed(self) -> None:
+        self._suggestions.max_size = self.config.max_suggestions
+        self._suggestions.trim()
+        self._model.set_page_len(self.config.page_len)
+        self._refresh.set_max_rate(self.config.max_refresh_rate)
+        self._gate.min_count = self.config.min_occurrences
+        self._rules.config = self.config
+        self.update_stats()
+        # Other settings change what gets briefed, so the list is redone
+        self.update_prep_list(force=True)
+        self._page = 0
+        self.update_table()
+        self.update_refresh_paused()
 
-    def update_table(self) -> None:
-        top_index = self._page * self.config.page_len
+    def update_refresh_paused(self) -> None:
+        # The window is first shown before the scheduler exists
+        if not hasattr(self, "_refresh"):
+            return
 
-        page_count = (len(self._suggestions) - 1) // self.config.page_len + 1
-        displayed = self._suggestions[top_index:top_index + self.config.page_len]
-        display_len = len(displayed)
+        if self.config.pause_hidden and (self.isHidden() or self.isMinimized()):
+            self._refresh.pause()
+        else:
+            self._refresh.resume()
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.update_refresh_paused()
+
+    def hideEvent(self, event) -> None:
+        super().hideEvent(event)
+        self.update_refresh_paused()
+
+    def changeEvent(self, event) -> None:
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.update_refresh_paused()
+
+    def update_prep_list(self, force: bool = False) -> None:
+        if self._prep.load(self.config.prep_list, force):
+            self._worker.set_idle_task(self._prep.step)
+
+    def check_brief_gen(self) -> None:
+        # Edits to the prep list are picked up on the same timer
+        super().check_brief_gen()
+        self.update_prep_list()
+
+    def cache_stats(self) -> dict:
+        return {
+            "reverse_lookup": self._reverse_cache.stats(),
+            "validation": self._validator.stats()
+        }
+
+    def stats_counters(self) -> Dict[str, Any]:
+        counters = {
+            f"{cache} {name}": value
+            for cache, cache_stats in self.cache_stats().items()
+            for name, value in cache_stats.items()
+        }
+        counters["superseded analyses"] = self._worker.dropped
+        counters["briefing script errors"] = self.config.brief_gen_errors
+        counters["pending commits"] = len(self._commits)
+        counters["suggestions"] = len(self._suggestions)
+        counters["prep list terms checked"] = f"{self._prep.done} of {self._prep.total}"
+        counters["prepared briefs"] = len(self._rules.prepared)
+        if self._gate.min_count > 1:
+            counters["most seen terms not yet suggested"] = ", ".join(
+                f"{term} ({seen})" for term, seen in self.top_unbriefed()
+            )
+        return counters
+
+    def update_stats(self) -> None:
+        # Stages are only wrapped while collecting, so turning it off
+        # takes the timing code out of the stroke path entirely
+        self.stats.uninstrument()
+        if not self.config.collect_stats:
+            return
+
+        for stage in ("find_briefs", "last_words", "is_briefable", "brief_text"):
+            self.stats.instrument(self._rules, stage, stage)
+        self.stats.instrument(self._outline_index, "first_free", "first_free")
+        self.stats.instrument(self.config, "_generate", "get_briefs", iterates=True)
+
+    def dump_stats(self) -> None:
+        try:
+            self.stats.dump(self.stats_log_path(), self.stats_counters())
+        except OSError:
+            log.warning("Autobrief couldn't save stats", exc_info=True)
 
-        for index, (translation, brief, added) in enumerate(displayed):
-            self.suggestions_table.setItem(index, 0, QTableWidgetItem(str(index + 1)))
-            self.suggestions_table.setItem(index, 1, QTableWidgetItem(translation))
-            self.suggestions_table.setItem(index, 2, QTableWidgetItem("/".join(brief)))
-            self.suggestions_table.setItem(index, 3, QTableWidgetItem("Added" * added))
+    def record_entry(self, entry: Suggestion) -> None:
+        if self.config.save_history:
+            self._history.record(entry)
 
-        if display_len < self.config.page_len:
-            for index in range(display_len, self.config.page_len):
-                for col in range(0, 4):
-                    self.suggestions_table.setItem(index, col, QTableWidgetItem(""))
-        
-        self.page_label.setText(f"Page {self._page + 1} of {page_count}")
+    def load_history_slice(self) -> None:
+        if self._history.load(self._suggestions, HISTORY_SLICE):
+            self.update_table()
 
-    def is_valid_stroke(self, stroke: str) -> bool:
-        try:
-            _ = SystemStroke(stroke)
-        except ValueError:
-            return False
-        
-        return True
-
-    def is_valid_outline(self, outline: StenoOutline) -> bool:
-        return all(self.is_valid_stroke(s) for s in outline.split("/"))
-
-    def is_briefable(self, text: str) -> bool:
-        if (
-            text in self._suggestion_keys
-            or len(text) < self.config.min_length
-            or any(c in self.config.exclude_chars for c in text)
-            or self.is_valid_outline(text)
-        ):
-            return False
-
-        splitted = text.split()
-        if len(splitted) > 1:
-            if self.config.brief_cap_phrases:
-                if not splitted[0][0].isupper():
-                    return False
-                if not splitted[-1][0].isupper():
-                    return False
-
-                cap_count = len([
-                    w for w in splitted
-                    if len(w) < 5 or w[0].isupper()
-                ])
-
-                if cap_count < len(splitted):
-                    return False
-                
-            else:
-                return False
-
-        # Don't suggest briefs for words that were from a non-explicit dict entry
-        for tl_obj in self.engine.translator_state.prev(2):
-            if (
-                text in tl_obj.english 
-                and len(tl_obj.rtfcre) < self.config.min_strokes
-            ):
-                return False
-
-        # Don't suggest briefs for all capitalized words
-        if len(splitted) == 1:
-            lookup_text = text.lower()
+        if self._history.exhausted:
+            self._history_timer.stop()
+
+    def ensure_loaded(self, count: Optional[int] = None) -> None:
+        # Pages past what has been restored so far are loaded on demand
+        if not self.config.save_history or self._history.exhausted:
+            return
+
+        if count is None:
+            count = self.config.max_suggestions
+
+        if self._history.load(self._suggestions, count - len(self._suggestions)):
+            self.update_table()
+
+    def close_history(self, *args) -> None:
+        self._history_timer.stop()
+        self._history.compact(self._suggestions)
+        self._history.close()
+
+    def top_unbriefed(self, count: int = 10) -> List[Tuple[str, int]]:
+        # Terms still waiting to be seen often enough to be suggested
+        return self._gate.counter.top(count, self._suggestions)
+
+    def commit_translation(self, brief: Outline, translation: str) -> None:
+        # Written to the dictionary in batches; the index is updated right
+        # away so the brief isn't suggested again in the meantime
+        self._commits.add(brief.strokes, translation, self.config.to_dict)
+        self._outline_index.add(brief, translation)
+
+    def on_commits_flushed(self, commits: List[Tuple[StenoOutline, str]]) -> None:
+        for brief, translation in commits:
+            self._reverse_cache.invalidate(translation)
+            self._outline_index.add(self._validator.outline(brief), translation)
+
+    def update_table(self) -> None:
+        self._refresh.schedule()
+
+    def update_entry(self, entry: Suggestion) -> None:
+        self._refresh.schedule(entry)
+
+    @timed_slot("update_table")
+    def refresh_table(self, full: bool, entries: Set[Suggestion]) -> None:
+        # Called by the refresh scheduler with every change since the last
+        # repaint merged together
+        if full:
+            page_count = (len(self._suggestions) - 1) // self.config.page_len + 1
+            self._model.set_page(self._page)
+            self._model.rows_changed()
+            self.page_label.setText(f"Page {self._page + 1} of {page_count}")
         else:
-            lookup_text = text
-        
-        outlines = self.engine.reverse_lookup(lookup_text)
-        if not outlines:
-            return True
+            for entry in entries:
+                self._model.entry_changed(entry)
 
-        if min(len(outline) for outline in outlines) >= self.config.min_strokes:
-            return True
+    def is_valid_stroke(self, stroke: str) -> bool:
+        return self._validator.is_valid_stroke(stroke)
 
-        return False
+    def is_valid_outline(self, outline: str) -> bool:
+        return self._validator.is_valid_outline(outline)
 
-    def is_valid_brief(self, brief: StenoOutline) -> bool:
-        if any(not self.is_valid_stroke(s) for s in brief):
-            return False
-        
-        if brief in self._suggestion_briefs:
-            return False
-        
-        if not self.config.override:
-            return (self.engine.lookup(brief) is None)
+    def passes_filters(self, text: str, recent: List[Translation]) -> bool:
+        return self._rules.passes_filters(text, recent)
+
+    def is_briefable(self, text: str, recent: List[Translation]) -> bool:
+        return self._rules.is_briefable(text, recent)
 
-        return True
+    def is_valid_brief(self, brief: Outline) -> bool:
+        return self._rules.is_valid_brief(brief)
     
-    def add_translation_dialog(self, arg_int: int) -> None:
-        translation, _, added = self._suggestions[arg_int]
+    def add_translation_dialog(self, entry: Suggestion) -> None:
+        from plover.gui_qt.add_translation_dialog import AddTranslationDialog
+
+        translation = entry.translation
 
-        if not added:
+        if not entry.added:
             dialog = AddTranslationDialog(self.engine, self.config.to_dict)
             dialog.add_translation.translation.setText(translation)
             dialog.add_translation.on_translation_edited()
@@ -146,43 +298,102 @@ class AutobriefSuggestions(AutobriefUI):
                 outlines = self.engine.dictionaries.get(
                     self.config.to_dict
                 ).reverse_lookup(translation)
-
-                if outlines:
-                    brief = iter(outlines).next()
-                    self._suggestions[arg_int] = (
-                        translation, 
-                        brief, 
-                        True
-                    )
-                    self.update_table()
+                self._reverse_cache.invalidate(translation)
+                # The dialog can overwrite an outline without changing the
+                # dictionary's length, so the index is told directly
+                for outline in self.engine.reverse_lookup(translation) or ():
+                    self._outline_index.add(self._validator.outline(outline), translation)
+
+                if outlines and self._suggestions.set_brief(
+                    entry,
+                    self._validator.outline(next(iter(outlines)))
+                ):
+                    entry.added = True
+                    self.record_entry(entry)
+                    self.update_entry(entry)
             
             dialog.finished.connect(on_finished)
             dialog.showNormal()
             dialog.activateWindow()
             dialog.raise_()
     
+    def commit_entries(self, entries: Iterable[Suggestion]) -> None:
+        committed = False
+        for entry in entries:
+            if not entry.added and entry.brief:
+                self.commit_translation(entry.brief, entry.translation)
+                entry.added = True
+                self.record_entry(entry)
+                committed = True
+
+        # Everything goes into a single dictionary save
+        if committed:
+            self._commits.flush()
+
     def handle_arg_macros(self, autobrief_state: str) -> None:
         autobrief_arg = self.engine._translator.autobrief_arg
-        if autobrief_arg and autobrief_arg.isnumeric():
-            arg_int = self._page * self.config.page_len + int(autobrief_arg) - 1
-            if arg_int >= len(self._suggestions):
-                pass
-
-            elif autobrief_state == "commit_brief":
-                translation, brief, added = self._suggestions[arg_int]
-                if not added and brief:
-                    self.engine.add_translation(brief, translation, self.config.to_dict)
-                    self._suggestions[arg_int] = (translation, brief, True)
-
-            elif autobrief_state == "define_brief":
-                self.add_translation_dialog(arg_int)
+        top_index = self._page * self.config.page_len
+        entries = [
+            self._suggestions[top_index + row - 1]
+            for row in parse_rows(autobrief_arg or "", self.config.page_len)
+            if 0 < row and top_index + row - 1 < len(self._suggestions)
+        ]
+        if not entries:
+            return
+
+        if autobrief_state == "commit_brief":
+            self.commit_entries(entries)
+
+        elif autobrief_state == "define_brief":
+            self.add_translation_dialog(entries[0])
+
+    def brief_text(self, text: str) -> Tuple[bool, Outline]:
+        return self._rules.brief_text(text)
+
+    def find_briefs(
+        self,
+        snapshot: Tuple[str, int, List[Translation]],
+        depth: int
+    ) -> List[Tuple[str, Outline]]:
+        # Runs on the analysis worker
+        return self._rules.find_briefs(snapshot, depth)
+
+    @timed_slot("on_suggestions_ready")
+    def on_suggestions_ready(self, brief_buffer: List[Tuple[str, Outline]]) -> None:
+        inserted = 0
+        for translation, brief in brief_buffer:
+            if translation in self._suggestions:
+                continue
+
+            if self.config.autoadd:
+                self.commit_translation(brief, translation)
+
+            self.record_entry(
+                self._suggestions.prepend(translation, brief, self.config.autoadd)
+            )
+            inserted += 1
+
+        # Each brief is now either in the store or no longer needed
+        for _, brief in brief_buffer:
+            self._rules.release(brief)
+
+        if inserted:
+            self.update_table()
 
+    @timed_slot("on_stroke")
     def on_stroke(self, _: tuple) -> None:
         update_suggestions = False
+        self._commits.poke()
+        self._worker.poke()
         
         if hasattr(self.engine._translator, "autobrief_state"):
             autobrief_state = self.engine._translator.autobrief_state
             update_suggestions = bool(autobrief_state)
+            if autobrief_state == "next_page":
+                self.ensure_loaded((self._page + 2) * self.config.page_len)
+            elif autobrief_state in ("prev_page", "commit_all"):
+                self.ensure_loaded()
+
             max_pages = (len(self._suggestions) - 1) // self.config.page_len + 1
 
             if autobrief_state == "prev_page":
@@ -190,62 +401,33 @@ class AutobriefSuggestions(AutobriefUI):
             
             elif autobrief_state == "next_page":
                 self._page = (self._page + 1) % max_pages
+
+            elif autobrief_state == "commit_page":
+                self.commit_entries(self._suggestions.page(
+                    self._page * self.config.page_len,
+                    self.config.page_len
+                ))
+
+            elif autobrief_state == "commit_all":
+                self.commit_entries(list(self._suggestions))
+
+            elif autobrief_state == "dump_stats":
+                self.dump_stats()
             
             elif hasattr(self.engine._translator, "autobrief_arg"):
                 self.handle_arg_macros(autobrief_state)
                 
             del self.engine._translator.autobrief_state
-            del self.engine._translator.autobrief_arg
+            if hasattr(self.engine._translator, "autobrief_arg"):
+                del self.engine._translator.autobrief_arg
 
         else:
-            prev_translations: List[Translation] = self.engine.translator_state.prev()
-            if not prev_translations:
-                return
-
-            retro_formatter: RetroFormatter = RetroFormatter(prev_translations)
-            last_words: List[str] = retro_formatter.last_words(self.config.search_depth)[:-1]
-
-            if not last_words:
+            if not self._buffer.text:
                 return
 
-            lw_length = len(last_words)
-            brief_buffer = []
-
-            # Last word
-            last_word = last_words[-1].strip()
-            if self.is_briefable(last_word):
-                briefs = self.config.get_briefs(last_word)
-                valid_briefs = [brief for brief in briefs if self.is_valid_brief(brief)]
-
-                if valid_briefs:
-                    brief_buffer.append((last_word, valid_briefs[0]))
-                elif self.config.no_briefer:
-                    brief_buffer.append((last_word, ""))
-
-            # Longest valid phrase that ends with last word
-            for index in range(0, lw_length - 2):
-                text_to_brief = "".join(last_words[index:lw_length]).strip()
-                if self.is_briefable(text_to_brief):
-                    briefs = self.config.get_briefs(text_to_brief)
-                    valid_briefs = [brief for brief in briefs if self.is_valid_brief(brief)]
-
-                    if valid_briefs:
-                        brief_buffer.append((text_to_brief, valid_briefs[0]))
-                        break
-                    elif self.config.no_briefer:
-                        brief_buffer.append((text_to_brief, ""))
-                        break
-
-            # Actually add the briefs
-            if brief_buffer:
-                update_suggestions = True
-                for translation, brief in brief_buffer:
-                    if self.config.autoadd:
-                        self.engine.add_translation(brief, translation, self.config.to_dict)
-
-                    self._suggestions.insert(0, (translation, brief, self.config.autoadd))
-                    self._suggestion_keys.add(translation)
-                    self._suggestion_briefs.add(brief)
+            # Everything past the snapshot happens on the analysis worker
+            recent: List[Translation] = self.engine.translator_state.prev(2) or []
+            self._worker.submit((self._buffer.text, self._buffer.position, list(recent)))
                     
         if update_suggestions:
             self.update_table()
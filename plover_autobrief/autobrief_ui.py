@@ -1,17 +1,27 @@
 from PyQt5.QtWidgets import (
-    QTableWidget, QGridLayout, QHeaderView, 
+    QTableView, QGridLayout, QHeaderView, 
     QLabel, QAction, QAbstractItemView
 )
-from PyQt5.QtCore import Qt, QSettings
+from PyQt5.QtCore import Qt, QSettings, QTimer
 from PyQt5.QtGui import QIcon, QKeySequence
 
+from typing import Any, Dict
+
+import os
+import threading
+
 from plover.engine import StenoEngine
 from plover.gui_qt.tool import Tool
+from plover.oslayer.config import CONFIG_DIR
 from plover.gui_qt.utils import ToolBar
 
 from plover_autobrief.resources_rc import *
 from plover_autobrief.autobrief_config import AutobriefConfig, CONFIG_ITEMS
-from plover_autobrief.config_ui import ConfigUI
+from plover_autobrief.autobrief_stats import PipelineStats
+
+
+STATS_LOG_FILE = "autobrief_stats.log"
+BRIEF_GEN_CHECK_MS = 2000
 
 class AutobriefUI(Tool):
     TITLE = "Autobrief"
@@ -22,17 +32,26 @@ class AutobriefUI(Tool):
         super().__init__(engine)
         self.engine: StenoEngine = engine
         self.config = AutobriefConfig()
+        self.stats = PipelineStats()
         self.restore_state()
         self.show_window()
         self.finished.connect(self.save_state)
+        self.finished.connect(lambda *args: self.config.close())
+
+        # Edits to the briefing script are picked up without a trip
+        # through the settings
+        self.brief_gen_reloading = False
+        self.brief_gen_timer = QTimer(self)
+        self.brief_gen_timer.timeout.connect(self.check_brief_gen)
+        self.brief_gen_timer.start(BRIEF_GEN_CHECK_MS)
+        self.finished.connect(self.brief_gen_timer.stop)
 
     def _restore_state(self, settings: QSettings) -> None:
         for attr, (_, attr_type) in CONFIG_ITEMS.items():
             if settings.contains(attr):
                 setattr(self.config, attr, settings.value(attr, type=attr_type))
 
-        if hasattr(self.config, "brief_gen") and self.config.brief_gen:
-                self.config.load_brief_gen()
+        self.config.load_brief_gen()
 
         self.prev_pin = False
         if settings.contains("pinned") and settings.value("pinned", type=bool):
@@ -52,9 +71,7 @@ class AutobriefUI(Tool):
         self.suggestions_label = QLabel(self)
         self.suggestions_label.setText("Brief Suggestions")
 
-        self.suggestions_table = QTableWidget(self)
-        self.suggestions_table.setRowCount(self.config.page_len)
-        self.suggestions_table.setColumnCount(4)
+        self.suggestions_table = QTableView(self)
         self.suggestions_table.verticalHeader().setDefaultSectionSize(self.config.row_height)
         self.suggestions_table.setMinimumHeight(self.config.row_height * self.config.page_len + self.config.row_height)
         self.suggestions_table.setAlternatingRowColors(True)
@@ -80,6 +97,12 @@ class AutobriefUI(Tool):
         self.settings_action.triggered.connect(self.on_settings)
         self.settings_action.setShortcut(QKeySequence("Ctrl+S"))
 
+        self.stats_action = QAction(self)
+        self.stats_action.setText("Autobrief stats")
+        self.stats_action.setToolTip("Show where Autobrief spends its time.")
+        self.stats_action.setIcon(QIcon(":/autobrief/stats.svg"))
+        self.stats_action.triggered.connect(self.on_stats)
+
         self.page_label = QLabel(self)
         self.page_label.setText("Page 0 of 0")
         self.page_label.setAlignment(Qt.AlignHCenter)
@@ -89,7 +112,8 @@ class AutobriefUI(Tool):
         self.layout.addWidget(self.suggestions_table, 3, 0, 1, 2)
         self.layout.addWidget(ToolBar(
             self.pin_action,
-            self.settings_action
+            self.settings_action,
+            self.stats_action
         ), 4, 0)
         self.layout.addWidget(self.page_label, 4, 1)
         self.setLayout(self.layout)
@@ -108,15 +132,52 @@ class AutobriefUI(Tool):
         self.show()
 
     def on_settings(self, *args) -> None:
+        # Dialogs are only imported once they're first opened, to keep
+        # Plover's startup (which imports every tool) quick
+        from plover_autobrief.config_ui import ConfigUI
+
         config_dialog = ConfigUI(self.config.copy(), self.engine, self)
         if config_dialog.exec():
+            self.config.close()
             self.config = config_dialog.temp_config
-            if self.config.brief_gen:
-                self.config.load_brief_gen()
+            self.config.load_brief_gen()
 
-            self.suggestions_table.setRowCount(self.config.page_len)
             self.suggestions_table.verticalHeader().setDefaultSectionSize(self.config.row_height)
             self.suggestions_table.setMinimumHeight(self.config.row_height * self.config.page_len + self.config.row_height)
+            self.on_config_changed()
+
+    def check_brief_gen(self) -> None:
+        if self.brief_gen_reloading or not self.config.brief_gen_changed():
+            return
+
+        # Loaded off the GUI thread; the old script stays in use until the
+        # new one has loaded and passed its checks
+        config = self.config
+        self.brief_gen_reloading = True
+
+        def reload() -> None:
+            try:
+                config.reload_brief_gen()
+            finally:
+                self.brief_gen_reloading = False
+
+        threading.Thread(target=reload, name="autobrief-brief-gen-reload", daemon=True).start()
+
+    def on_stats(self, *args) -> None:
+        from plover_autobrief.stats_ui import StatsUI
+
+        stats_dialog = StatsUI(self.stats, self.stats_counters, self.stats_log_path(), self)
+        stats_dialog.finished.connect(stats_dialog.deleteLater)
+        stats_dialog.show()
+
+    def stats_log_path(self) -> str:
+        return os.path.join(CONFIG_DIR, STATS_LOG_FILE)
+
+    def stats_counters(self) -> Dict[str, Any]:
+        return {}
+
+    def on_config_changed(self) -> None:
+        pass
 
     def get_autobrief_config(self) -> AutobriefConfig:
         return self.config
@@ -0,0 +1,128 @@
+import re
+
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Tuple, Union
+
+from plover import system
+
+from plover_autobrief.autobrief_cache import LRUCache
+from plover_autobrief.autobrief_outline import EMPTY_OUTLINE, Outline, pack_masks
+
+
+def _key_slot(key: str) -> str:
+    letters = [key.strip("-")]
+    number = getattr(system, "NUMBERS", {}).get(key)
+    if number:
+        letters.append(number.strip("-"))
+
+    return "(" + "|".join(re.escape(letter) for letter in letters) + ")?"
+
+
+def compile_stroke_pattern(keys: Tuple[str, ...], implicit: Iterable[str]) -> Pattern:
+    # Keys are laid out left bank, implicit hyphen keys, right bank; any
+    # bank can be empty and a "-" may stand in for the middle. There is
+    # one group per key, in the same order as keys.
+    implicit = set(implicit)
+    implicit_indices = [i for i, key in enumerate(keys) if key in implicit]
+    if implicit_indices:
+        start, end = implicit_indices[0], implicit_indices[-1] + 1
+    else:
+        start = end = len([key for key in keys if not key.startswith("-")])
+
+    left = "".join(_key_slot(key) for key in keys[:start])
+    middle = "".join(_key_slot(key) for key in keys[start:end])
+    right = "".join(_key_slot(key) for key in keys[end:])
+
+    # At least one key; a "-" only ever separates the banks
+    return re.compile(f"(?!-?\\Z){left}(?:-|{middle}){right}")
+
+
+class StrokeValidator:
+    # Parses strokes into key masks over the current system's keys, which
+    # is also what decides whether a stroke is valid.
+    def __init__(self, max_size: int = 8192) -> None:
+        self._cache = LRUCache(max_size)
+        self._keys: Optional[Tuple[str, ...]] = None
+        self._pattern: Optional[Pattern] = None
+        self._letters: List[str] = []
+        self._number_bit = 0
+
+    def _check_system(self) -> None:
+        # plover.system swaps its module globals when the system changes
+        keys = getattr(system, "KEYS", None)
+        if keys is self._keys:
+            return
+
+        self._keys = keys
+        self._cache.clear()
+        if keys:
+            self._pattern = compile_stroke_pattern(
+                keys,
+                getattr(system, "IMPLICIT_HYPHEN_KEYS", ())
+            )
+            self._letters = [key.strip("-") for key in keys]
+            number_key = getattr(system, "NUMBER_KEY", None)
+            self._number_bit = 1 << keys.index(number_key) if number_key in keys else 0
+        else:
+            self._pattern = None
+
+    def _parse_stroke(self, stroke: str) -> Optional[int]:
+        # Nothing is valid until a system is set up
+        match = self._pattern.fullmatch(stroke) if self._pattern is not None else None
+        if match is None:
+            return None
+
+        mask = 0
+        for index, letter in enumerate(match.groups()):
+            if letter:
+                mask |= 1 << index
+                # Digits stand for the number key as well
+                if letter != self._letters[index]:
+                    mask |= self._number_bit
+
+        return mask
+
+    def stroke_mask(self, stroke: str) -> Optional[int]:
+        self._check_system()
+        return self._cache.get_or_compute(stroke, self._parse_stroke)
+
+    def is_valid_stroke(self, stroke: str) -> bool:
+        return self.stroke_mask(stroke) is not None
+
+    def outline_key(
+        self,
+        strokes: Sequence[str],
+        masks: Optional[Dict[str, Optional[int]]] = None
+    ) -> Optional[int]:
+        # For bulk encoding, masks can be a plain dict to use as the cache
+        # instead of the shared one
+        self._check_system()
+        if masks is None:
+            stroke_mask = self.stroke_mask
+        else:
+            def stroke_mask(stroke: str) -> Optional[int]:
+                mask = masks.get(stroke, -1)
+                if mask == -1:
+                    mask = masks[stroke] = self._parse_stroke(stroke)
+                return mask
+
+        return pack_masks(map(stroke_mask, strokes), len(self._keys or ()))
+
+    def outline(self, strokes: Union[str, Sequence[str], Outline]) -> Outline:
+        if isinstance(strokes, Outline):
+            return strokes
+
+        if isinstance(strokes, str):
+            strokes = strokes.split("/") if strokes else ()
+
+        if not strokes:
+            return EMPTY_OUTLINE
+
+        rtfcre = "/".join(strokes)
+        key = self.outline_key(strokes)
+        return Outline(rtfcre if key is None else key, rtfcre)
+
+    def is_valid_outline(self, outline: Union[str, Sequence[str], Outline]) -> bool:
+        return self.outline(outline).valid
+
+    def stats(self) -> dict:
+        return self._cache.stats()
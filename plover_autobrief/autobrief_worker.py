@@ -0,0 +1,118 @@
+import threading
+import time
+
+from typing import Any, Callable, Optional
+
+from plover import log
+
+
+# Strokes have to stop for this long before idle work starts
+IDLE_SECONDS = 1.0
+
+
+class AnalysisWorker(threading.Thread):
+    def __init__(
+        self,
+        analyze: Callable[[Any, int], list],
+        on_result: Callable[[list], None]
+    ) -> None:
+        super().__init__(name="autobrief-analysis", daemon=True)
+        self._analyze = analyze
+        self._on_result = on_result
+        self._cond = threading.Condition()
+        self._pending: Optional[Any] = None
+        self._pending_depth = 0
+        self._running = True
+        self._idle_task: Optional[Callable[[Callable[[], bool]], Optional[bool]]] = None
+        self._last_active = 0.0
+        self.dropped = 0
+
+    def set_idle_task(self, task: Optional[Callable[[Callable[[], bool]], Optional[bool]]]) -> None:
+        # Run a slice at a time between strokes, until it returns False, or
+        # None to try again after another idle period. It's passed a
+        # callable that says when a stroke is waiting, so it can stop early.
+        with self._cond:
+            self._idle_task = task
+            self._cond.notify()
+
+    def poke(self) -> None:
+        self._last_active = time.monotonic()
+
+    def busy(self) -> bool:
+        return (
+            self._pending is not None
+            or not self._running
+            or time.monotonic() - self._last_active < IDLE_SECONDS
+        )
+
+    def submit(self, snapshot: Any) -> None:
+        with self._cond:
+            if not self._running:
+                return
+
+            # A newer stroke supersedes the queued one; its snapshot already
+            # contains the older words, so only the number of word endings
+            # left to analyse has to be carried over.
+            if self._pending is not None:
+                self.dropped += 1
+
+            self._pending = snapshot
+            self._pending_depth += 1
+            self._last_active = time.monotonic()
+            self._cond.notify()
+
+    def stop(self, *args) -> None:
+        with self._cond:
+            self._running = False
+            self._pending = None
+            self._cond.notify()
+
+    def run(self) -> None:
+        while True:
+            with self._cond:
+                idle_task = None
+                while self._pending is None and self._running:
+                    if self._idle_task is None:
+                        self._cond.wait()
+                        continue
+
+                    wait = self._last_active + IDLE_SECONDS - time.monotonic()
+                    if wait <= 0:
+                        idle_task = self._idle_task
+                        break
+
+                    self._cond.wait(wait)
+
+                if not self._running:
+                    return
+
+                snapshot, depth = self._pending, self._pending_depth
+                self._pending = None
+                self._pending_depth = 0
+
+            if idle_task is not None:
+                self.run_idle(idle_task)
+                continue
+
+            try:
+                result = self._analyze(snapshot, depth)
+            except Exception:
+                log.error("Autobrief analysis failed", exc_info=True)
+                continue
+
+            if result:
+                self._on_result(result)
+
+    def run_idle(self, task: Callable[[Callable[[], bool]], Optional[bool]]) -> None:
+        try:
+            more = task(self.busy)
+        except Exception:
+            log.error("Autobrief idle work failed", exc_info=True)
+            more = False
+
+        if more is None:
+            self._last_active = time.monotonic()
+        elif not more:
+            with self._cond:
+                if self._idle_task is task:
+                    self._idle_task = None
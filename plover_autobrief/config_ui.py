@@ -33,6 +33,17 @@ class ConfigUI(QDialog):
         if file_path:
             self.brief_gen_box.setText(file_path)
 
+    def select_prep_file(self) -> str:
+        file_path = QFileDialog.getOpenFileName(
+            self,
+            "Open Prep Word List",
+            "",
+            "Text files (*.txt);;All files (*)"
+        )[0]
+
+        if file_path:
+            self.prep_list_box.setText(file_path)
+
     def setup_window(self) -> None:
         self.resize(350, 200)
 
@@ -42,7 +53,7 @@ class ConfigUI(QDialog):
         self.autoadd_box.setChecked(self.temp_config.autoadd)
 
         self.brief_unknown_words_label = QLabel(self)
-        self.brief_unknown_words_label.setText("Automatically add briefs")
+        self.brief_unknown_words_label.setText("Brief words that aren't in any dictionary")
         self.brief_unknown_words_box = QCheckBox(self)
         self.brief_unknown_words_box.setChecked(self.temp_config.brief_unknown_words)
 
@@ -83,6 +94,29 @@ class ConfigUI(QDialog):
         self.brief_gen_box.setText(self.temp_config.brief_gen)
         self.brief_gen_browse = QPushButton("Browse", self)
         self.brief_gen_browse.clicked.connect(self.select_brief_file)
+        self.brief_gen_builtin_box = QCheckBox("Use built-in briefing script", self)
+        self.brief_gen_builtin_box.setChecked(self.temp_config.brief_gen_builtin)
+        self.brief_gen_builtin_box.toggled.connect(self.brief_gen_box.setDisabled)
+        self.brief_gen_builtin_box.toggled.connect(self.brief_gen_browse.setDisabled)
+        self.brief_gen_box.setDisabled(self.temp_config.brief_gen_builtin)
+        self.brief_gen_browse.setDisabled(self.temp_config.brief_gen_builtin)
+
+        self.brief_gen_process_label = QLabel(self)
+        self.brief_gen_process_label.setText("Run briefing script in worker processes")
+        self.brief_gen_process_box = QCheckBox(self)
+        self.brief_gen_process_box.setChecked(self.temp_config.brief_gen_process)
+
+        self.brief_gen_timeout_label = QLabel(self)
+        self.brief_gen_timeout_label.setText("Worker time limit per word (ms)")
+        self.brief_gen_timeout_box = QSpinBox(self)
+        self.brief_gen_timeout_box.setRange(10, 10000)
+        self.brief_gen_timeout_box.setValue(self.temp_config.brief_gen_timeout)
+
+        self.brief_budget_label = QLabel(self)
+        self.brief_budget_label.setText("Briefs to try per word (0 for no limit)")
+        self.brief_budget_box = QSpinBox(self)
+        self.brief_budget_box.setRange(0, 10000)
+        self.brief_budget_box.setValue(self.temp_config.brief_budget)
 
         self.min_length_label = QLabel(self)
         self.min_length_label.setText("Minimum word/phrase length to brief")
@@ -100,7 +134,7 @@ class ConfigUI(QDialog):
         self.search_depth_label.setText("Maximum buffer search depth")
         self.search_depth_box = QSpinBox(self)
         self.search_depth_box.setValue(self.temp_config.search_depth)
-        self.search_depth_box.setRange(2, 10)
+        self.search_depth_box.setRange(2, 30)
 
         self.row_height_label = QLabel(self)
         self.row_height_label.setText("Row Height")
@@ -114,6 +148,46 @@ class ConfigUI(QDialog):
         self.page_len_box.setValue(self.temp_config.page_len)
         self.page_len_box.setRange(1, 30)
 
+        self.max_suggestions_label = QLabel(self)
+        self.max_suggestions_label.setText("Maximum number of briefs to keep")
+        self.max_suggestions_box = QSpinBox(self)
+        self.max_suggestions_box.setRange(10, 100000)
+        self.max_suggestions_box.setValue(self.temp_config.max_suggestions)
+
+        self.max_refresh_rate_label = QLabel(self)
+        self.max_refresh_rate_label.setText("Maximum table refreshes per second")
+        self.max_refresh_rate_box = QSpinBox(self)
+        self.max_refresh_rate_box.setRange(1, 120)
+        self.max_refresh_rate_box.setValue(self.temp_config.max_refresh_rate)
+
+        self.pause_hidden_label = QLabel(self)
+        self.pause_hidden_label.setText("Don't refresh the table while minimized")
+        self.pause_hidden_box = QCheckBox(self)
+        self.pause_hidden_box.setChecked(self.temp_config.pause_hidden)
+
+        self.min_occurrences_label = QLabel(self)
+        self.min_occurrences_label.setText("Suggest once a word has been written this many times")
+        self.min_occurrences_box = QSpinBox(self)
+        self.min_occurrences_box.setRange(1, 100)
+        self.min_occurrences_box.setValue(self.temp_config.min_occurrences)
+
+        self.save_history_label = QLabel(self)
+        self.save_history_label.setText("Remember suggestions between sessions")
+        self.save_history_box = QCheckBox(self)
+        self.save_history_box.setChecked(self.temp_config.save_history)
+
+        self.collect_stats_label = QLabel(self)
+        self.collect_stats_label.setText("Collect timing statistics")
+        self.collect_stats_box = QCheckBox(self)
+        self.collect_stats_box.setChecked(self.temp_config.collect_stats)
+
+        self.prep_list_label = QLabel(self)
+        self.prep_list_label.setText("Word list to brief ahead of time")
+        self.prep_list_box = QLineEdit(self)
+        self.prep_list_box.setText(self.temp_config.prep_list)
+        self.prep_list_browse = QPushButton("Browse", self)
+        self.prep_list_browse.clicked.connect(self.select_prep_file)
+
         self.button_box = QDialogButtonBox(
             (
                 QDialogButtonBox.Cancel | 
@@ -141,33 +215,66 @@ class ConfigUI(QDialog):
         self.layout.addWidget(self.to_dict_box, 6, 1)
         self.layout.addWidget(self.brief_gen_label, 7, 0)
         self.layout.addWidget(self.brief_gen_box, 7, 1)
+        self.layout.addWidget(self.brief_gen_builtin_box, 8, 0)
         self.layout.addWidget(self.brief_gen_browse, 8, 1)
-        self.layout.addWidget(self.min_length_label, 9, 0)
-        self.layout.addWidget(self.min_length_box, 9, 1)
-        self.layout.addWidget(self.min_strokes_label, 10, 0)
-        self.layout.addWidget(self.min_strokes_box, 10, 1)
-        self.layout.addWidget(self.search_depth_label, 11, 0)
-        self.layout.addWidget(self.search_depth_box, 11, 1)
-        self.layout.addWidget(self.row_height_label, 12, 0)
-        self.layout.addWidget(self.row_height_box, 12, 1)
-        self.layout.addWidget(self.page_len_label, 13, 0)
-        self.layout.addWidget(self.page_len_box, 13, 1)
-        self.layout.addWidget(self.button_box, 14, 1)
+        self.layout.addWidget(self.brief_gen_process_label, 9, 0)
+        self.layout.addWidget(self.brief_gen_process_box, 9, 1)
+        self.layout.addWidget(self.brief_gen_timeout_label, 10, 0)
+        self.layout.addWidget(self.brief_gen_timeout_box, 10, 1)
+        self.layout.addWidget(self.brief_budget_label, 11, 0)
+        self.layout.addWidget(self.brief_budget_box, 11, 1)
+        self.layout.addWidget(self.min_length_label, 12, 0)
+        self.layout.addWidget(self.min_length_box, 12, 1)
+        self.layout.addWidget(self.min_strokes_label, 13, 0)
+        self.layout.addWidget(self.min_strokes_box, 13, 1)
+        self.layout.addWidget(self.search_depth_label, 14, 0)
+        self.layout.addWidget(self.search_depth_box, 14, 1)
+        self.layout.addWidget(self.row_height_label, 15, 0)
+        self.layout.addWidget(self.row_height_box, 15, 1)
+        self.layout.addWidget(self.page_len_label, 16, 0)
+        self.layout.addWidget(self.page_len_box, 16, 1)
+        self.layout.addWidget(self.max_suggestions_label, 17, 0)
+        self.layout.addWidget(self.max_suggestions_box, 17, 1)
+        self.layout.addWidget(self.max_refresh_rate_label, 18, 0)
+        self.layout.addWidget(self.max_refresh_rate_box, 18, 1)
+        self.layout.addWidget(self.pause_hidden_label, 19, 0)
+        self.layout.addWidget(self.pause_hidden_box, 19, 1)
+        self.layout.addWidget(self.min_occurrences_label, 20, 0)
+        self.layout.addWidget(self.min_occurrences_box, 20, 1)
+        self.layout.addWidget(self.save_history_label, 21, 0)
+        self.layout.addWidget(self.save_history_box, 21, 1)
+        self.layout.addWidget(self.collect_stats_label, 22, 0)
+        self.layout.addWidget(self.collect_stats_box, 22, 1)
+        self.layout.addWidget(self.prep_list_label, 23, 0)
+        self.layout.addWidget(self.prep_list_box, 23, 1)
+        self.layout.addWidget(self.prep_list_browse, 24, 1)
+        self.layout.addWidget(self.button_box, 25, 1)
         self.setLayout(self.layout)
 
     def save_settings(self) -> None:
         self.temp_config.autoadd = self.autoadd_box.isChecked()
-        self.temp_config.brief_unknown_words = self.brief_cap_phrases_box.isChecked()
+        self.temp_config.brief_unknown_words = self.brief_unknown_words_box.isChecked()
         self.temp_config.brief_case_sensitive = self.brief_case_sensitive_box.isChecked()
         self.temp_config.brief_cap_phrases = self.brief_cap_phrases_box.isChecked()
         self.temp_config.override = self.override_box.isChecked()
         self.temp_config.exclude_chars = self.exclude_chars_box.text()
         self.temp_config.to_dict = self.to_dict_box.currentText()
         self.temp_config.brief_gen = self.brief_gen_box.text()
+        self.temp_config.brief_gen_builtin = self.brief_gen_builtin_box.isChecked()
+        self.temp_config.brief_gen_process = self.brief_gen_process_box.isChecked()
+        self.temp_config.brief_gen_timeout = self.brief_gen_timeout_box.value()
+        self.temp_config.brief_budget = self.brief_budget_box.value()
         self.temp_config.min_length = self.min_length_box.value()
         self.temp_config.min_strokes = self.min_strokes_box.value()
         self.temp_config.search_depth = self.search_depth_box.value()
         self.temp_config.row_height = self.row_height_box.value()
         self.temp_config.page_len = self.page_len_box.value()
+        self.temp_config.max_suggestions = self.max_suggestions_box.value()
+        self.temp_config.max_refresh_rate = self.max_refresh_rate_box.value()
+        self.temp_config.pause_hidden = self.pause_hidden_box.isChecked()
+        self.temp_config.min_occurrences = self.min_occurrences_box.value()
+        self.temp_config.save_history = self.save_history_box.isChecked()
+        self.temp_config.collect_stats = self.collect_stats_box.isChecked()
+        self.temp_config.prep_list = self.prep_list_box.text()
         
         self.accept()
@@ -0,0 +1,98 @@
+from PyQt5.QtWidgets import (
+    QDialog, QWidget, QLabel, QPlainTextEdit,
+    QDialogButtonBox, QPushButton, QVBoxLayout
+)
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFontDatabase
+
+from typing import Any, Callable, Dict
+
+from plover import log
+
+from plover_autobrief.autobrief_stats import PipelineStats
+
+
+REFRESH_MS = 1000
+
+
+class StatsUI(QDialog):
+
+    def __init__(
+        self,
+        stats: PipelineStats,
+        counters: Callable[[], Dict[str, Any]],
+        log_path: str,
+        parent: QWidget = None
+    ) -> None:
+        super().__init__(parent)
+        self.stats = stats
+        self.counters = counters
+        self.log_path = log_path
+        self.shown_enabled = None
+        self.setup_window()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(REFRESH_MS)
+        self.refresh()
+
+    def setup_window(self) -> None:
+        self.setWindowTitle("Autobrief Stats")
+        self.resize(560, 480)
+
+        self.status_label = QLabel(self)
+        self.status_label.setWordWrap(True)
+
+        self.report_box = QPlainTextEdit(self)
+        self.report_box.setReadOnly(True)
+        self.report_box.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Close, parent=self)
+        self.reset_button = QPushButton("Reset", self)
+        self.dump_button = QPushButton("Save to log", self)
+        self.button_box.addButton(self.reset_button, QDialogButtonBox.ResetRole)
+        self.button_box.addButton(self.dump_button, QDialogButtonBox.ActionRole)
+        self.button_box.rejected.connect(self.reject)
+        self.reset_button.clicked.connect(self.on_reset)
+        self.dump_button.clicked.connect(self.on_dump)
+
+        self.layout = QVBoxLayout()
+        self.layout.addWidget(self.status_label)
+        self.layout.addWidget(self.report_box)
+        self.layout.addWidget(self.button_box)
+        self.setLayout(self.layout)
+
+    def refresh(self) -> None:
+        # Left alone otherwise, so messages from the buttons stay up
+        if self.stats.enabled != self.shown_enabled:
+            self.shown_enabled = self.stats.enabled
+            self.update_status()
+
+        lines = [self.stats.report(), ""]
+        lines.extend(f"{name}: {value}" for name, value in self.counters().items())
+
+        scroll = self.report_box.verticalScrollBar().value()
+        self.report_box.setPlainText("\n".join(lines))
+        self.report_box.verticalScrollBar().setValue(scroll)
+
+    def update_status(self) -> None:
+        if self.stats.enabled:
+            self.status_label.setText("Timings of the most recent strokes.")
+        else:
+            self.status_label.setText(
+                "Timing is turned off. Turn on \"Collect timing statistics\" "
+                "in the settings to see where the time goes."
+            )
+
+    def on_reset(self) -> None:
+        self.stats.reset()
+        self.update_status()
+        self.refresh()
+
+    def on_dump(self) -> None:
+        try:
+            self.stats.dump(self.log_path, self.counters())
+            self.status_label.setText(f"Saved to {self.log_path}")
+        except OSError:
+            log.warning("Autobrief couldn't save stats", exc_info=True)
+            self.status_label.setText(f"Couldn't save to {self.log_path}")
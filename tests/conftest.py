@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from plover import system
+
+from plover_autobrief.autobrief_brief_cache import BriefCache
+from plover_autobrief.autobrief_cache import ReverseLookupCache
+from plover_autobrief.autobrief_config import AutobriefConfig
+from plover_autobrief.autobrief_frequency import OccurrenceGate
+from plover_autobrief.autobrief_index import OutlineIndex
+from plover_autobrief.autobrief_rules import BriefRules
+from plover_autobrief.autobrief_store import SuggestionStore
+from plover_autobrief.autobrief_validator import StrokeValidator
+
+
+# English Stenotype, as plover.system has it once that system is set up
+KEYS = (
+    "#",
+    "S-", "T-", "K-", "P-", "W-", "H-", "R-",
+    "A-", "O-",
+    "*",
+    "-E", "-U",
+    "-F", "-R", "-P", "-B", "-L", "-G", "-T", "-S", "-D", "-Z"
+)
+IMPLICIT_HYPHEN_KEYS = ("A-", "O-", "5-", "0-", "-E", "-U", "*")
+NUMBERS = {
+    "S-": "1-", "T-": "2-", "P-": "3-", "H-": "4-", "A-": "5-",
+    "O-": "0-", "-F": "-6", "-P": "-7", "-L": "-8", "-T": "-9"
+}
+
+
+@pytest.fixture
+def steno_system(monkeypatch):
+    monkeypatch.setattr(system, "KEYS", KEYS, raising=False)
+    monkeypatch.setattr(system, "IMPLICIT_HYPHEN_KEYS", IMPLICIT_HYPHEN_KEYS, raising=False)
+    monkeypatch.setattr(system, "NUMBERS", NUMBERS, raising=False)
+    monkeypatch.setattr(system, "NUMBER_KEY", "#", raising=False)
+
+
+class FakeDictionary(dict):
+    enabled = True
+    timestamp = 0
+
+
+class FakeDictionaries:
+    def __init__(self, *dicts: FakeDictionary) -> None:
+        self.dicts = list(dicts)
+
+
+class FakeEngine:
+    # Just the lookups the plugin makes, over a stack of dictionaries with
+    # the highest priority first
+    def __init__(self, *dicts: dict) -> None:
+        self.dictionaries = FakeDictionaries(*(FakeDictionary(dic) for dic in dicts))
+
+    def lookup(self, strokes):
+        for dic in self.dictionaries.dicts:
+            if dic.enabled and tuple(strokes) in dic:
+                return dic[tuple(strokes)]
+
+        return None
+
+    def reverse_lookup(self, translation):
+        return [
+            outline
+            for dic in self.dictionaries.dicts
+            for outline, value in dic.items()
+            if value == translation and self.lookup(outline) == translation
+        ]
+
+
+# What the briefing script gives for every term, best first
+CANDIDATES = [("KAT",), ("KAT", "-S"), ("KA", "-T"), ("K", "A", "T")]
+
+
+@pytest.fixture
+def rules(tmp_path, steno_system):
+    engine = FakeEngine({("KAT",): "cat", ("TKOG",): "dog"})
+    validator = StrokeValidator()
+    index = OutlineIndex(engine, validator)
+    index.rebuild(wait=True)
+
+    config = AutobriefConfig()
+    config._brief_cache = BriefCache(str(tmp_path / "briefs.db"))
+    config._brief_cache.set_source("test")
+    config._get_briefs = lambda text: iter(CANDIDATES)
+
+    return BriefRules(
+        config,
+        SuggestionStore(),
+        index,
+        ReverseLookupCache(engine),
+        validator,
+        OccurrenceGate()
+    )
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
@@ -0,0 +1,83 @@
+import sqlite3
+
+from plover_autobrief.autobrief_brief_cache import BriefCache
+
+
+def rows(path):
+    with sqlite3.connect(path) as db:
+        return sorted(db.execute("SELECT text FROM briefs").fetchall())
+
+
+def test_round_trip(tmp_path):
+    cache = BriefCache(str(tmp_path / "briefs.db"))
+    cache.set_source("script")
+    cache.put("word", [("S",), ("T",)], False)
+
+    assert cache.get("word") == ([("S",), ("T",)], False)
+    assert cache.get("other") is None
+
+    # From disk, in a new session
+    cache = BriefCache(str(tmp_path / "briefs.db"))
+    cache.set_source("script")
+    assert cache.get("word") == ([("S",), ("T",)], False)
+
+
+def test_sources_kept_apart(tmp_path):
+    path = str(tmp_path / "briefs.db")
+    cache = BriefCache(path)
+    cache.set_source("first")
+    cache.put("word", [("S",)])
+
+    cache.set_source("second")
+    assert cache.get("word") is None
+    cache.put("word", [("T",)])
+
+    # Switching back doesn't start over
+    cache.set_source("first")
+    assert cache.get("word") == ([("S",)], True)
+
+
+def test_stale_put_dropped(tmp_path):
+    cache = BriefCache(str(tmp_path / "briefs.db"))
+    cache.set_source("first")
+    source_hash = cache.source_hash
+    cache.set_source("second")
+    cache.put("word", [("S",)], source_hash=source_hash)
+
+    assert cache.get("word") is None
+
+
+def test_old_rows_from_other_scripts_pruned(tmp_path):
+    path = str(tmp_path / "briefs.db")
+    cache = BriefCache(path, max_age=0)
+    cache.set_source("first")
+    cache.put("old", [("S",)])
+    cache.set_source("second")
+    cache.put("new", [("T",)])
+
+    assert rows(path) == [("new",)]
+
+
+def test_size_capped(tmp_path):
+    path = str(tmp_path / "briefs.db")
+    cache = BriefCache(path, max_rows=2)
+    cache.set_source("first")
+    for text in ("one", "two", "three"):
+        cache.put(text, [("S",)])
+
+    cache.set_source("second")
+    assert rows(path) == [("three",), ("two",)]
+
+
+def test_upgrades_old_cache(tmp_path):
+    path = str(tmp_path / "briefs.db")
+    with sqlite3.connect(path) as db:
+        db.execute(
+            "CREATE TABLE briefs (source TEXT, text TEXT, briefs TEXT, "
+            "PRIMARY KEY (source, text))"
+        )
+
+    cache = BriefCache(path)
+    cache.set_source("script")
+    cache.put("word", [("S",)])
+    assert cache.get("word") == ([("S",)], True)
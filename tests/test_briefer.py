@@ -0,0 +1,40 @@
+import itertools
+
+import pytest
+
+from plover_autobrief.autobrief_briefer import get_briefs
+from plover_autobrief.autobrief_validator import StrokeValidator
+
+
+def first(text, count=20):
+    return list(itertools.islice(get_briefs(text), count))
+
+
+@pytest.mark.parametrize("text", ["example", "structure", "photography", "Grand Central Station"])
+def test_briefs_are_valid_strokes(steno_system, text):
+    validator = StrokeValidator()
+    briefs = first(text)
+
+    assert briefs
+    for brief in briefs:
+        assert isinstance(brief, tuple)
+        assert validator.is_valid_outline(brief), brief
+
+
+def test_no_duplicates():
+    briefs = first("example", 200)
+    assert len(briefs) == len(set(briefs))
+
+
+def test_phrases_get_one_stroke_per_word_or_fewer():
+    for brief in first("Grand Central Station"):
+        assert 1 <= len(brief) <= 3
+
+
+def test_lazy():
+    assert next(get_briefs("example")) == first("example", 1)[0]
+
+
+def test_nothing_to_brief():
+    assert first("") == []
+    assert first("!!!") == []
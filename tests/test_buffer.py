@@ -0,0 +1,54 @@
+from plover_autobrief.autobrief_buffer import WordBuffer, last_words
+
+
+def test_last_words():
+    assert last_words("the quick brown fox ", 2) == ["brown ", "fox "]
+    assert last_words("Hello, world", 3) == ["Hello", ", ", "world"]
+    assert last_words("one", 5) == ["one"]
+    assert last_words("", 3) == []
+
+
+def test_last_words_long_text():
+    text = "word " * 1000 + "last"
+    assert last_words(text, 3) == ["word ", "word ", "last"]
+
+
+def test_send_and_backspace():
+    buffer = WordBuffer()
+    buffer.send_string("hello ")
+    buffer.send_string("wrold")
+    buffer.send_backspaces(4)
+    buffer.send_string("orld")
+
+    assert buffer.text == "hello world"
+    assert buffer.position == len("hello world")
+    assert buffer.last_words(2) == ["hello ", "world"]
+
+
+def test_backspace_past_start():
+    buffer = WordBuffer()
+    buffer.send_string("abc")
+    buffer.send_backspaces(10)
+    buffer.send_backspaces(0)
+
+    assert buffer.text == ""
+    assert buffer.position == -7
+
+
+def test_trim_keeps_position():
+    buffer = WordBuffer(max_chars=10)
+    for _ in range(10):
+        buffer.send_string("abcde ")
+
+    assert len(buffer.text) <= 20
+    assert buffer.text.endswith("abcde ")
+    assert buffer.position == 60
+
+
+def test_reset():
+    buffer = WordBuffer()
+    buffer.send_string("some text")
+    buffer.reset()
+
+    assert buffer.text == ""
+    assert buffer.last_words(3) == []
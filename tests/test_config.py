@@ -0,0 +1,110 @@
+import pytest
+
+from plover_autobrief.autobrief_config import AutobriefConfig
+
+
+SCRIPT = """
+CALLS = []
+
+def get_briefs(text):
+    CALLS.append(text)
+    for index in range(5):
+        yield ("S" + "-" * index,) if index else ("S",)
+"""
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "briefer.py"
+    path.write_text(SCRIPT, encoding="utf-8")
+
+    config = AutobriefConfig({"brief_gen": str(path)})
+    config.brief_cache_path = str(tmp_path / "briefs.db")
+    config.load_brief_gen()
+    yield config
+    config.close()
+
+
+def test_briefs_cached(config):
+    assert not config.no_briefer()
+    first = config.get_briefs("word")
+    assert len(first) == 5
+    assert config.get_briefs("word") == first
+
+    calls = config._get_briefs.__globals__["CALLS"]
+    assert calls.count("word") == 1
+
+
+def test_stopping_early_keeps_what_was_pulled(config):
+    briefs = config.iter_briefs("word")
+    assert next(briefs) == ("S",)
+    briefs.close()
+
+    pulled, complete = config._brief_cache.get("word")
+    assert pulled == [("S",)]
+    assert not complete
+
+
+def test_budget_result_not_cached_as_complete(config):
+    config.brief_budget = 2
+    assert len(config.get_briefs("word")) == 2
+
+    pulled, complete = config._brief_cache.get("word")
+    assert len(pulled) == 2
+    assert not complete
+
+    # A larger budget gets the rest from the script
+    config.brief_budget = 0
+    assert len(config.get_briefs("word")) == 5
+    assert config._brief_cache.get("word")[1]
+
+
+def test_script_running_out_within_budget_is_complete(config):
+    config.brief_budget = 10
+    assert len(config.get_briefs("word")) == 5
+    assert config._brief_cache.get("word")[1]
+
+
+def test_reload_clears_results(config, tmp_path):
+    config.get_briefs("word")
+    (tmp_path / "briefer.py").write_text(
+        "def get_briefs(text):\n    return [('T',)]\n",
+        encoding="utf-8"
+    )
+
+    assert config.reload_brief_gen()
+    assert config.get_briefs("word") == [("T",)]
+
+
+def test_broken_script_keeps_previous(config, tmp_path):
+    config.no_briefer()
+    (tmp_path / "briefer.py").write_text("def get_briefs(:\n", encoding="utf-8")
+
+    assert not config.reload_brief_gen()
+    assert len(config.get_briefs("word")) == 5
+
+
+FAILING_SCRIPT = """
+def get_briefs(text):
+    if text == "raises":
+        raise ValueError(text)
+
+    yield ("S",)
+    if text == "stops":
+        raise ValueError(text)
+    yield ("T",)
+"""
+
+
+@pytest.mark.parametrize("text, briefs", [("raises", []), ("stops", [("S",)])])
+def test_script_errors_not_cached(config, tmp_path, text, briefs):
+    (tmp_path / "briefer.py").write_text(FAILING_SCRIPT, encoding="utf-8")
+    assert config.reload_brief_gen()
+
+    assert config.get_briefs(text) == briefs
+    assert config.brief_gen_errors == 1
+    assert config._brief_cache.get(text) is None
+
+    # Other words are unaffected
+    assert config.get_briefs("word") == [("S",), ("T",)]
+    assert config.brief_gen_errors == 1
@@ -0,0 +1,68 @@
+from plover_autobrief.autobrief_frequency import OccurrenceGate, SpaceSaving
+
+
+def test_space_saving_counts():
+    counter = SpaceSaving(10)
+    for key in "aabbbc":
+        counter.add(key)
+
+    assert counter.top(2) == [("b", 3), ("a", 2)]
+    assert len(counter) == 3
+
+
+def test_space_saving_evicts_least_frequent():
+    counter = SpaceSaving(2)
+    counter.add("a")
+    counter.add("a")
+    counter.add("b")
+
+    # "c" takes over "b"'s slot, and its count
+    assert counter.add("c") == 2
+    assert len(counter) == 2
+    assert dict(counter.top()) == {"a": 2, "c": 2}
+
+
+def test_space_saving_discard():
+    counter = SpaceSaving(2)
+    counter.add("a")
+    counter.discard("a")
+    counter.discard("missing")
+
+    assert len(counter) == 0
+    assert counter.add("a") == 1
+
+
+def test_gate_lets_everything_through_by_default():
+    gate = OccurrenceGate()
+    assert gate.seen("word", 0)
+    assert gate.seen("word", 0)
+
+
+def test_gate_counts_occurrences_once():
+    gate = OccurrenceGate(min_count=2)
+
+    assert not gate.seen("word", 10)
+    # The same occurrence analysed again
+    assert not gate.seen("word", 10)
+    assert gate.seen("word", 25)
+
+
+def test_gate_keeps_count_until_consumed():
+    gate = OccurrenceGate(min_count=2)
+    gate.seen("word", 10)
+
+    assert gate.seen("word", 20)
+    # Not briefed, so the next occurrence still counts
+    assert gate.seen("word", 30)
+
+    gate.consume("word")
+    assert not gate.seen("word", 40)
+
+
+def test_space_saving_top_excludes():
+    counter = SpaceSaving(10)
+    for key in "aaabbc":
+        counter.add(key)
+
+    # Still fills the list when the most frequent keys are left out
+    assert counter.top(2, exclude={"a"}) == [("b", 2), ("c", 1)]
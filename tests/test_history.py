@@ -0,0 +1,70 @@
+import json
+
+from plover_autobrief.autobrief_history import SuggestionHistory
+from plover_autobrief.autobrief_store import SuggestionStore
+from plover_autobrief.autobrief_validator import StrokeValidator
+
+
+def test_round_trip(tmp_path, steno_system):
+    path = str(tmp_path / "history.jsonl")
+    validator = StrokeValidator()
+    store = SuggestionStore()
+    history = SuggestionHistory(path, validator.outline)
+    history.record(store.prepend("cat", validator.outline("KAT"), False))
+    history.record(store.prepend("dog", validator.outline("TKOG"), False))
+    cat = store.get("cat")
+    cat.added = True
+    history.record(cat)
+    history.close()
+
+    restored = SuggestionStore()
+    history = SuggestionHistory(path, validator.outline)
+    assert history.load(restored, 1) == 1
+    assert history.load(restored, 10) == 1
+    assert history.exhausted
+
+    # The newest record for each translation wins
+    assert [entry.translation for entry in restored] == ["cat", "dog"]
+    assert restored.get("cat").added
+    assert restored.get("cat").brief == validator.outline("KAT")
+    assert restored.get("dog").brief.valid
+
+
+def test_skips_bad_records(tmp_path, steno_system):
+    path = tmp_path / "history.jsonl"
+    path.write_text(
+        json.dumps({"translation": "cat", "brief": ["KAT"], "added": False}) + "\n"
+        "not json\n"
+        + json.dumps({"brief": ["TKOG"]}) + "\n",
+        encoding="utf-8"
+    )
+
+    store = SuggestionStore()
+    history = SuggestionHistory(str(path), StrokeValidator().outline)
+    assert history.load(store, 10) == 1
+    assert [entry.translation for entry in store] == ["cat"]
+
+
+def test_missing_file(tmp_path):
+    history = SuggestionHistory(str(tmp_path / "missing.jsonl"), StrokeValidator().outline)
+    assert history.load(SuggestionStore(), 10) == 0
+    assert history.exhausted
+
+
+def test_compact(tmp_path, steno_system):
+    path = str(tmp_path / "history.jsonl")
+    validator = StrokeValidator()
+    store = SuggestionStore()
+    history = SuggestionHistory(path, validator.outline)
+    entry = store.prepend("cat", validator.outline("KAT"), False)
+    for _ in range(5):
+        history.record(entry)
+    history.close()
+
+    history = SuggestionHistory(path, validator.outline)
+    restored = SuggestionStore()
+    history.load(restored, 10)
+    history.compact(restored)
+
+    with open(path, encoding="utf-8") as fp:
+        assert len(fp.readlines()) == 1
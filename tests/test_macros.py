@@ -0,0 +1,23 @@
+from plover_autobrief.autobrief_macros import parse_rows
+
+
+def test_single_rows():
+    assert parse_rows("3", 10) == [3]
+    assert parse_rows("1,3,5", 10) == [1, 3, 5]
+    assert parse_rows(" 2 , 4 ", 10) == [2, 4]
+
+
+def test_ranges():
+    assert parse_rows("1-3", 10) == [1, 2, 3]
+    assert parse_rows("2-4,7", 10) == [2, 3, 4, 7]
+    assert parse_rows("5-3", 10) == []
+
+
+def test_ranges_stop_at_page_length():
+    assert parse_rows("1-99999999", 10) == list(range(1, 11))
+    assert parse_rows("8-12", 10) == [8, 9, 10]
+
+
+def test_junk_ignored():
+    assert parse_rows("", 10) == []
+    assert parse_rows("a,1-b,-3,4", 10) == [4]
@@ -0,0 +1,41 @@
+import pickle
+
+import pytest
+
+from plover_autobrief.autobrief_outline import EMPTY_OUTLINE, pack_masks
+from plover_autobrief.autobrief_validator import StrokeValidator
+
+
+@pytest.fixture
+def validator(steno_system):
+    return StrokeValidator()
+
+
+def test_invalid_outline_keyed_by_text(validator):
+    outline = validator.outline("KAT/xyz")
+    assert not outline.valid
+    assert outline.key == "KAT/xyz"
+    assert outline != validator.outline("KAT")
+
+
+def test_empty_outline(validator):
+    assert validator.outline("") is EMPTY_OUTLINE
+    assert validator.outline(()) is EMPTY_OUTLINE
+    assert not EMPTY_OUTLINE
+    assert EMPTY_OUTLINE.strokes == ()
+
+
+def test_pack_masks():
+    # The marker bit keeps the stroke count from depending on the keys
+    assert pack_masks([1], 3) != pack_masks([1, 0], 3)
+    assert pack_masks([1, 2], 3) != pack_masks([2, 1], 3)
+    assert pack_masks([1, None], 3) is None
+    assert pack_masks([], 3) == 0
+
+
+def test_pickle(validator):
+    outline = validator.outline("KAT/-S")
+    restored = pickle.loads(pickle.dumps(outline))
+    assert restored == outline
+    assert restored.rtfcre == "KAT/-S"
+    assert hash(restored) == hash(outline)
@@ -0,0 +1,161 @@
+import threading
+import time
+
+import pytest
+
+from conftest import wait_for
+
+from plover_autobrief import autobrief_prep, autobrief_worker
+from plover_autobrief.autobrief_index import OutlineIndex
+from plover_autobrief.autobrief_prep import PrepList, read_prep_list
+from plover_autobrief.autobrief_worker import AnalysisWorker
+
+
+@pytest.fixture
+def idle_seconds(monkeypatch):
+    monkeypatch.setattr(autobrief_worker, "IDLE_SECONDS", 0.05)
+    return 0.05
+
+
+def never_yield():
+    return False
+
+
+def write_list(tmp_path, text):
+    path = tmp_path / "prep.txt"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_read_prep_list(tmp_path):
+    path = write_list(tmp_path, "# names\ncatalogue\n\n  Grand   Central  \ncatalogue\n")
+    assert read_prep_list(path) == ["catalogue", "Grand Central"]
+
+
+def test_prep_list_briefs_terms(tmp_path, rules):
+    prep = PrepList(rules)
+    assert prep.load(write_list(tmp_path, "catalogue\ncatalyst\ncat\n"))
+
+    while prep.step(never_yield):
+        pass
+
+    assert prep.done == prep.total == 3
+    assert rules.prepared.get("catalogue").brief == rules.validator.outline("KAT/-S")
+    assert rules.prepared.get("catalyst").brief == rules.validator.outline("KA/-T")
+    # Already in the dictionary
+    assert "cat" not in rules.prepared
+
+
+def test_prep_list_waits_for_index(tmp_path, rules):
+    index = rules.outline_index
+    rules.outline_index = OutlineIndex(index.engine, rules.validator)
+    prep = PrepList(rules)
+    prep.load(write_list(tmp_path, "catalogue\n"))
+
+    assert prep.step(never_yield) is None
+    assert prep.done == 0
+
+    rules.outline_index = index
+    assert prep.step(never_yield) is False
+    assert "catalogue" in rules.prepared
+
+
+def test_prep_list_capped(tmp_path, rules, monkeypatch):
+    monkeypatch.setattr(autobrief_prep, "MAX_PREPARED", 1)
+    prep = PrepList(rules)
+    prep.load(write_list(tmp_path, "catalogue\ncatalyst\n"))
+
+    assert prep.step(never_yield) is False
+    assert len(rules.prepared) == 1
+
+
+def test_prep_list_unchanged_not_reloaded(tmp_path, rules):
+    prep = PrepList(rules)
+    path = write_list(tmp_path, "catalogue\n")
+    assert prep.load(path)
+    assert not prep.load(path)
+    assert prep.load(path, force=True)
+
+
+def test_idle_task_waits_for_quiet(idle_seconds):
+    runs = []
+
+    def task(should_yield):
+        runs.append(time.monotonic())
+        return len(runs) < 3
+
+    worker = AnalysisWorker(lambda snapshot, depth: [], lambda result: None)
+    worker.start()
+    try:
+        worker.submit("text")
+        submitted = time.monotonic()
+        assert worker.busy()
+        worker.set_idle_task(task)
+        wait_for(lambda: len(runs) == 3)
+        time.sleep(idle_seconds * 2)
+    finally:
+        worker.stop()
+
+    assert runs[0] - submitted >= idle_seconds * 0.9
+    # Finished once it returned False
+    assert len(runs) == 3
+
+
+def test_idle_task_yields_to_strokes(idle_seconds):
+    yielded = threading.Event()
+    submitted = threading.Event()
+
+    def task(should_yield):
+        # Stands in for a slice that's interrupted by a stroke
+        if not submitted.is_set():
+            worker.submit("text")
+            submitted.set()
+        if should_yield():
+            yielded.set()
+        return False
+
+    worker = AnalysisWorker(lambda snapshot, depth: [], lambda result: None)
+    worker.start()
+    try:
+        worker.set_idle_task(task)
+        assert yielded.wait(2)
+    finally:
+        worker.stop()
+
+
+def test_idle_task_retried_later(idle_seconds):
+    runs = []
+
+    def task(should_yield):
+        runs.append(time.monotonic())
+        return None if len(runs) < 2 else False
+
+    worker = AnalysisWorker(lambda snapshot, depth: [], lambda result: None)
+    worker.start()
+    try:
+        worker.set_idle_task(task)
+        wait_for(lambda: len(runs) == 2)
+    finally:
+        worker.stop()
+
+    # Not ready yet, so it waited another idle period instead of spinning
+    assert runs[1] - runs[0] >= idle_seconds * 0.9
+
+
+def test_failing_idle_task_dropped(idle_seconds):
+    runs = []
+
+    def task(should_yield):
+        runs.append(None)
+        raise ValueError("broken")
+
+    worker = AnalysisWorker(lambda snapshot, depth: [], lambda result: None)
+    worker.start()
+    try:
+        worker.set_idle_task(task)
+        wait_for(lambda: runs)
+        time.sleep(idle_seconds * 3)
+    finally:
+        worker.stop()
+
+    assert len(runs) == 1
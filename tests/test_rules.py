@@ -0,0 +1,105 @@
+import pytest
+
+from conftest import CANDIDATES
+
+from plover_autobrief.autobrief_outline import EMPTY_OUTLINE
+
+
+def test_skips_occupied_briefs(rules):
+    found, brief = rules.brief_text("catalogue")
+    assert found
+    assert brief == rules.validator.outline("KAT/-S")
+
+
+def test_skips_briefs_in_the_store(rules):
+    rules.suggestions.prepend("cats", rules.validator.outline("KAT/-S"), False)
+
+    found, brief = rules.brief_text("catalogue")
+    assert brief == rules.validator.outline("KA/-T")
+
+
+def test_pending_briefs_held_until_released(rules):
+    first = rules.brief_text("catalogue")[1]
+    rules.reserve(first)
+    second = rules.brief_text("catalyst")[1]
+
+    assert second != first
+    assert not rules.is_valid_brief(first)
+
+    rules.release(first)
+    assert rules.brief_text("catalyst")[1] == first
+    assert not rules.pending
+
+
+def test_find_briefs_unique_within_a_call(rules):
+    text = "catalogue catalyst category "
+    briefs = rules.find_briefs((text, len(text), []), 3)
+
+    assert [term for term, _ in briefs] == ["catalogue", "catalyst"]
+    assert len({brief for _, brief in briefs}) == 2
+    assert sum(rules.pending.values()) == 2
+
+    for _, brief in briefs:
+        rules.release(brief)
+    assert not rules.pending
+
+
+def test_nothing_free(rules):
+    for candidate in CANDIDATES[1:]:
+        rules.reserve(rules.validator.outline(candidate))
+
+    assert rules.brief_text("catalogue") == (False, EMPTY_OUTLINE)
+
+
+def test_no_briefer(rules):
+    rules.config._get_briefs = None
+    assert rules.brief_text("catalogue") == (True, EMPTY_OUTLINE)
+
+
+def test_override_still_avoids_reserved(rules):
+    rules.config.override = True
+    assert rules.brief_text("catalogue")[1] == rules.validator.outline("KAT")
+
+    rules.reserve(rules.validator.outline("KAT"))
+    assert rules.brief_text("catalogue")[1] == rules.validator.outline("KAT/-S")
+
+
+def test_prepared_brief_used_first(rules):
+    prepared = rules.validator.outline("K/A/T")
+    rules.prepared.append("catalogue", prepared, False)
+
+    assert rules.brief_text("catalogue") == (True, prepared)
+    # Other terms can't take it
+    assert rules.brief_text("catalyst")[1] == rules.validator.outline("KAT/-S")
+
+
+def test_filters(rules):
+    assert not rules.is_briefable("cat", [])
+    assert not rules.is_briefable("KAT/-S", [])
+    assert not rules.is_briefable("it's", [])
+    assert rules.is_briefable("catalogue", [])
+
+    rules.suggestions.prepend("catalogue", EMPTY_OUTLINE, False)
+    assert not rules.is_briefable("catalogue", [])
+
+
+def test_failed_job_hands_briefs_back(rules):
+    rules.gate.min_count = 2
+    text = "catalogue catalyst category "
+    rules.find_briefs((text, len(text), []), 3)
+    brief_text = rules.brief_text
+
+    def failing_brief_text(term):
+        if term == "catalyst":
+            raise ValueError(term)
+        return brief_text(term)
+
+    rules.brief_text = failing_brief_text
+    text += "catalogue catalyst category "
+    with pytest.raises(ValueError):
+        rules.find_briefs((text, len(text), []), 3)
+
+    assert not rules.pending
+    # "catalogue" wasn't briefed after all, so its count still stands
+    counts = dict(rules.gate.counter.top())
+    assert counts["catalogue"] == counts["catalyst"] == 2
@@ -0,0 +1,58 @@
+from plover_autobrief.autobrief_stats import PipelineStats, timed_slot
+
+
+class Stage:
+    def __init__(self, stats: PipelineStats) -> None:
+        self.stats = stats
+        self.calls = []
+
+    def work(self, value: int) -> int:
+        return value * 2
+
+    def briefs(self):
+        yield from ("a", "b")
+
+    @timed_slot("slot")
+    def slot(self, value: int) -> int:
+        self.calls.append(value)
+        return value + 1
+
+
+def test_instrument_and_uninstrument():
+    stats = PipelineStats()
+    stage = Stage(stats)
+    stats.instrument(stage, "work", "work")
+    assert stats.enabled
+    assert stage.work(2) == 4
+    assert stats.stages["work"].count == 1
+
+    stats.uninstrument()
+    assert not stats.enabled
+    assert "work" not in vars(stage)
+    stage.work(2)
+    assert stats.stages["work"].count == 1
+
+
+def test_generators_timed_as_consumed():
+    stats = PipelineStats()
+    stage = Stage(stats)
+    stats.instrument(stage, "briefs", "briefs", iterates=True)
+
+    briefs = stage.briefs()
+    assert "briefs" not in stats.stages
+    assert list(briefs) == ["a", "b"]
+    assert stats.stages["briefs"].count == 1
+
+
+def test_timed_slot_only_while_collecting():
+    stats = PipelineStats()
+    stage = Stage(stats)
+    # Bound before collection starts, like a connected slot
+    slot = stage.slot
+    assert slot(1) == 2
+    assert "slot" not in stats.stages
+
+    stats.instrument(stage, "work", "work")
+    assert slot(2) == 3
+    assert stats.stages["slot"].count == 1
+    assert stage.calls == [1, 2]
@@ -0,0 +1,61 @@
+from plover_autobrief.autobrief_outline import Outline
+from plover_autobrief.autobrief_store import SuggestionStore
+
+
+KAT = Outline(1, "KAT")
+TKOG = Outline(2, "TKOG")
+PWEUR = Outline(3, "PWEUR")
+
+
+def test_prepend_and_append_order():
+    store = SuggestionStore()
+    store.prepend("cat", KAT, False)
+    store.prepend("dog", TKOG, False)
+    store.append("bird", PWEUR, True)
+
+    assert [entry.translation for entry in store] == ["dog", "cat", "bird"]
+    assert store.get("bird").added
+    assert "cat" in store and "fish" not in store
+    assert [entry.translation for entry in store.page(1, 5)] == ["cat", "bird"]
+
+
+def test_append_never_replaces_newer_entry():
+    store = SuggestionStore()
+    store.prepend("cat", KAT, False)
+
+    assert store.append("cat", TKOG, False) is None
+    assert store.get("cat").brief == KAT
+    assert TKOG not in store.briefs
+
+
+def test_trim_releases_briefs():
+    store = SuggestionStore(2)
+    store.prepend("cat", KAT, False)
+    store.prepend("dog", TKOG, False)
+    store.prepend("bird", PWEUR, False)
+
+    assert len(store) == 2
+    assert "cat" not in store
+    assert KAT not in store.briefs
+    assert store.briefs[TKOG] == 1
+
+
+def test_shared_brief_counted_per_entry():
+    store = SuggestionStore()
+    store.prepend("cat", KAT, False)
+    store.prepend("kat", KAT, False)
+    store.set_brief(store.get("cat"), TKOG)
+
+    assert store.briefs[KAT] == 1
+    assert store.briefs[TKOG] == 1
+
+
+def test_set_brief_on_trimmed_entry():
+    store = SuggestionStore(1)
+    cat = store.prepend("cat", KAT, False)
+    store.prepend("dog", TKOG, False)
+
+    assert not store.set_brief(cat, PWEUR)
+    assert cat.brief == KAT
+    assert PWEUR not in store.briefs
+    assert dict(store.briefs) == {TKOG: 1}
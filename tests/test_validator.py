@@ -0,0 +1,44 @@
+import pytest
+
+from plover_autobrief.autobrief_validator import StrokeValidator
+
+
+@pytest.fixture
+def validator(steno_system):
+    return StrokeValidator()
+
+
+@pytest.mark.parametrize("stroke", ["KAT", "S-", "-T", "TK-S", "*", "#", "STKPWHRAO*EUFRPBLGTSDZ", "1", "12K"])
+def test_valid_strokes(validator, stroke):
+    assert validator.is_valid_stroke(stroke)
+
+
+@pytest.mark.parametrize("stroke", ["", "-", "--", "TAK", "A-T", "KAT-", "x", "S--T"])
+def test_invalid_strokes(validator, stroke):
+    assert not validator.is_valid_stroke(stroke)
+
+
+@pytest.mark.parametrize("outline", ["A//B", "A/", "/A", "KAT/-"])
+def test_empty_strokes_make_outline_invalid(validator, outline):
+    assert not validator.is_valid_outline(outline)
+
+
+def test_outline_equality(validator):
+    assert validator.outline("KAT/-S") == validator.outline(("KAT", "-S"))
+    assert validator.outline("KAT") != validator.outline("KAT/-S")
+    assert validator.outline("-T") != validator.outline("T")
+    assert len(validator.outline("KAT/-S")) == 2
+    assert validator.outline("KAT/-S").strokes == ("KAT", "-S")
+
+
+def test_numbers_include_number_key(validator):
+    assert validator.outline("1") == validator.outline("#S")
+    assert validator.outline("-9") == validator.outline("#-T")
+    assert validator.outline("1") != validator.outline("S")
+
+
+def test_no_system_means_nothing_valid(monkeypatch):
+    from plover import system
+
+    monkeypatch.setattr(system, "KEYS", None, raising=False)
+    assert not StrokeValidator().is_valid_outline("KAT")
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from conftest import wait_for
+
+from plover_autobrief.autobrief_worker import AnalysisWorker
+
+
+def test_superseded_jobs_collapse():
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def analyze(snapshot, depth):
+        calls.append((snapshot, depth))
+        started.set()
+        release.wait()
+        return [snapshot]
+
+    worker = AnalysisWorker(analyze, results.append)
+    worker.start()
+    try:
+        worker.submit("first")
+        assert started.wait(2)
+        for snapshot in ("second", "third", "fourth"):
+            worker.submit(snapshot)
+
+        release.set()
+        wait_for(lambda: len(results) == 2)
+    finally:
+        worker.stop()
+
+    # Only the newest snapshot is analysed, covering every word ending
+    assert calls == [("first", 1), ("fourth", 3)]
+    assert results == [["first"], ["fourth"]]
+    assert worker.dropped == 2
+
+
+def test_empty_results_not_reported():
+    results = []
+    worker = AnalysisWorker(lambda snapshot, depth: [], results.append)
+    worker.start()
+    try:
+        worker.submit("text")
+        time.sleep(0.05)
+    finally:
+        worker.stop()
+
+    assert results == []
+
+
+def test_analysis_errors_dont_stop_worker():
+    results = []
+
+    def analyze(snapshot, depth):
+        if snapshot == "bad":
+            raise ValueError(snapshot)
+        return [snapshot]
+
+    worker = AnalysisWorker(analyze, results.append)
+    worker.start()
+    try:
+        worker.submit("bad")
+        time.sleep(0.05)
+        worker.submit("good")
+        wait_for(lambda: results)
+    finally:
+        worker.stop()
+
+    assert results == [["good"]]